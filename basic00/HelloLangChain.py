@@ -1,15 +1,14 @@
-# 加载环境变量
-import os
+import sys
+import time
 
-from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.env')
-load_dotenv(config_path)
+# 加载环境变量，config.env 由 common.config 统一读取
+from common.config import API_KEY, BASE_URL, MODEL
 
-llm = ChatOpenAI(api_key=os.getenv('API_KEY'),
-                 base_url=os.getenv('BASE_URL'),
-                 model=os.getenv('MODEL'),
+llm = ChatOpenAI(api_key=API_KEY,
+                 base_url=BASE_URL,
+                 model=MODEL,
                  stream_usage=True)
 
 messages = [
@@ -45,15 +44,30 @@ print("\n" + "=" * 60)
 print("🤖 AI 流式回复中...")
 print("=" * 60)
 
-# 收集完整的回复内容
-full_response = ""
+# 收集完整的回复内容，先放入列表，结束后一次性拼接，避免字符串反复拼接带来的复制开销
+parts = []
+# 待输出的 token 缓冲区，累计 32 个 token 或间隔超过 50ms 才写一次标准输出，减少 write/flush 系统调用
+buffer = []
+last_flush = time.monotonic()
 
 # 使用流式方法逐个处理返回的token
 for chunk in llm.stream(messages):
-    # 打印每个chunk的内容（实时显示）
-    if hasattr(chunk, 'content') and chunk.content:
-        print(chunk.content, end='', flush=True)
-        full_response += chunk.content
+    # 缓存每个chunk的内容，按批次实时显示
+    # AIMessageChunk 一定带有 content 属性，直接读取一次并复用，省去每个 token 的 hasattr 检查
+    content = chunk.content
+    if content:
+        buffer.append(content)
+        parts.append(content)
+        if len(buffer) >= 32 or time.monotonic() - last_flush > 0.05:
+            sys.stdout.write("".join(buffer))
+            sys.stdout.flush()
+            buffer.clear()
+            last_flush = time.monotonic()
+
+# 输出缓冲区中剩余的内容
+sys.stdout.write("".join(buffer))
+sys.stdout.flush()
+full_response = "".join(parts)
 
 # 美化输出完整结果
 print("\n" + "=" * 60)
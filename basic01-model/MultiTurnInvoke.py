@@ -1,134 +1,90 @@
-import os
+import asyncio
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.env')
-load_dotenv(config_path)
+from common.config import MODEL
+from common.llm import init_model
+from common.pretty import pretty_print_ai_response
 
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model = os.getenv('MODEL')
+# 模型名称，config.env 由 common.config 统一加载
+model = MODEL
 
 
-def pretty_print_ai_response_prefix(response_type="sync"):
-    separator = "=" * 60
+# 系统提示词，多轮对话的每一轮都使用完全相同的内容，保证请求前缀逐字节一致
+SYSTEM_PROMPT = "你现在扮演盛唐最著名的大诗人李白，以狂放不羁、飘逸梦幻、大气磅礴的风格著称"
 
-    print(f"\n{separator}")
-    if response_type == "stream":
-        print("🤖 AI 流式回复中...")
-    else:
-        print("🤖 AI 智能回复")
-    print(separator)
+# 会话标识，作为 prompt_cache_key 传给服务端：同一会话的请求会被路由到同一缓存，
+# 相同的 系统提示词 + 历史消息 前缀可以直接复用服务端的 KV 缓存（prefix caching），
+# 新一轮对话只需要计算新增的内容，从而降低首 token 延迟（vLLM 的测试中命中前缀缓存的轮次 TTFT 降低 18%~41%）
+CONVERSATION_ID = "li-bai-moonlight"
 
 
-def pretty_print_ai_response_suffix(response):
-    separator = "=" * 60
-    # 技术信息
-    print(f"\n{separator}")
-    print("📊 技术详情:")
-    print(f"  📁 类型: {type(response).__name__}")
-
-    # Token 使用情况
-    if hasattr(response, 'usage_metadata') and response.usage_metadata:
-        print(f"  💰 Token: {response.usage_metadata}")
-    elif hasattr(response, 'usage') and response.usage:
-        print(f"  💰 Token: {response.usage}")
-    else:
-        print("  💰 Token: 未提供")
-
-    # 对象属性统计
-    attr_count = len([attr for attr in dir(response) if not attr.startswith('_')])
-    print(f"  🔍 属性数: {attr_count} 个")
-    print(separator)
-
-
-def pretty_print_ai_response(response):
+# 对话中固定不变的前缀（提示词、上一轮问答、古诗原文）定义在模块顶层，只创建一次，
+# 每次请求的前缀逐字节一致，避免在函数体内重复构造字符串时引入空白差异导致服务端前缀缓存失效
+FIRST_QUESTION = "请帮我写一首关于明月光的古诗"
+MOON_POEM = """《明月光赋》
+青天裂镜落九秋，冰魄初悬满神州。
+欲借银河斟北斗，醉倾玉壶白玉秋。
+清辉漫洒如秋霜刃，碎影徘徊似夜眸。
+醉舞广寒宫阙外，扶摇直上破苍穹。
+明月照我意未尽，且邀清辉醉心田。"""
+FOLLOW_UP_QUESTION = "我希望在上面的返回中，添加一些关于仙人、侠客的内容"
+
+FIXED_CONVERSATION = (
+    # 系统提示词
+    {"role": "system", "content": SYSTEM_PROMPT},
+    # 用户的问答
+    {"role": "user", "content": FIRST_QUESTION},
+    # 模型回答
+    {"role": "assistant", "content": MOON_POEM},
+)
+
+FIXED_MESSAGES = (
+    # 系统提示词
+    SystemMessage(SYSTEM_PROMPT),
+    # 用户的问答
+    HumanMessage(FIRST_QUESTION),
+    # 模型回答
+    AIMessage(MOON_POEM),
+)
+
+
+async def multi_turn_invoke(model, question=FOLLOW_UP_QUESTION, conversation_id=CONVERSATION_ID):
     """
-    美化的 AI 响应输出
-    :param response: 大模型的返回
+    多轮对话
+    :param model: 已初始化的 LLM Model
+    :param question: 本轮用户的提问，追加在固定的对话前缀之后
+    :param conversation_id: 会话标识，用于服务端的前缀缓存
     :return:
     """
-    pretty_print_ai_response_prefix("sync")
-
-    # 主要内容显示
-    print(f"\n💬 回复内容:")
-    if hasattr(response, 'content'):
-        print(response.content)
-    else:
-        print(str(response))
-
-    pretty_print_ai_response_suffix(response)
-
-
-def init_model(model):
-    # 初始化 LLM Model
-    return init_chat_model(model=model,
-                           model_provider="openai",  # 指定模型厂商
-                           temperature=0.7,  # 温度，控制返回更稳定还是更有创造力的结果
-                           timeout=30,  # 设置超时时间，单位秒
-                           max_tokens=1000,  # 限制响应中的令牌总数，从而有效地控制输出的长度。
-                           max_retries=3,  # 最大失败重试次数
-                           )
+    conversation = [*FIXED_CONVERSATION, {"role": "user", "content": question}]
+    # 添加系统提示，通过 extra_body 透传 prompt_cache_key，便于服务端命中前缀缓存
+    response = await model.ainvoke(conversation, extra_body={"prompt_cache_key": f"conv:{conversation_id}"})
+    pretty_print_ai_response(response)
 
 
-def multi_turn_invoke(model):
+async def multi_turn_invoke_v2(model, question=FOLLOW_UP_QUESTION, conversation_id=CONVERSATION_ID):
     """
     多轮对话
-    :param model:
+    :param model: 已初始化的 LLM Model
+    :param question: 本轮用户的提问，追加在固定的对话前缀之后
+    :param conversation_id: 会话标识，用于服务端的前缀缓存
     :return:
     """
-    # 初始化 LLM Model
-    model = init_model(model)
-
-    conversation = [
-        # 系统提示词
-        {"role": "system", "content": "你现在扮演盛唐最著名的大诗人李白，以狂放不羁、飘逸梦幻、大气磅礴的风格著称"},
-        # 用户的问答
-        {"role": "user", "content": "请帮我写一首关于明月光的古诗"},
-        # 模型回答
-        {"role": "assistant", "content": """《明月光赋》
-青天裂镜落九秋，冰魄初悬满神州。
-欲借银河斟北斗，醉倾玉壶白玉秋。
-清辉漫洒如秋霜刃，碎影徘徊似夜眸。
-醉舞广寒宫阙外，扶摇直上破苍穹。
-明月照我意未尽，且邀清辉醉心田。"""},
-        {"role": "user", "content": "我希望在上面的返回中，添加一些关于仙人、侠客的内容"},
-    ]
-    # 添加系统提示
-    response = model.invoke(conversation)
+    # 与上面的区别在于前面传json传，这里是通过 message 类 来区分消息类型，阅读更友好
+    conversation = [*FIXED_MESSAGES, HumanMessage(question)]
+    # 添加系统提示，通过 extra_body 透传 prompt_cache_key，便于服务端命中前缀缓存
+    response = await model.ainvoke(conversation, extra_body={"prompt_cache_key": f"conv:{conversation_id}"})
     pretty_print_ai_response(response)
 
 
-print("--" * 30 + " model传输多轮对话(系统+用户提示) " + "--" * 30)
-multi_turn_invoke(model)
+async def main():
+    # 两个多轮对话示例相互独立，通过 asyncio.gather 并发发起请求，总耗时取决于最慢的一次调用
+    # 初始化 LLM Model，两个示例共用同一个实例
+    # 重复运行时相同的请求由 common.config 启用的全局 SQLite 缓存直接返回
+    llm = init_model(model)
+    await asyncio.gather(multi_turn_invoke(llm), multi_turn_invoke_v2(llm))
 
 
-def multi_turn_invoke_v2(model):
-    """
-    多轮对话
-    :param model:
-    :return:
-    """
-    # 初始化 LLM Model
-    model = init_model(model)
-    # 与上面的区别在于前面传json传，这里是通过 message 类 来区分消息类型，阅读更友好
-    conversation = [
-        # 系统提示词
-        SystemMessage("你现在扮演盛唐最著名的大诗人李白，以狂放不羁、飘逸梦幻、大气磅礴的风格著称"),
-        # 用户的问答
-        HumanMessage("请帮我写一首关于明月光的古诗"),
-        # 模型回答
-        AIMessage("""《明月光赋》
-青天裂镜落九秋，冰魄初悬满神州。
-欲借银河斟北斗，醉倾玉壶白玉秋。
-清辉漫洒如秋霜刃，碎影徘徊似夜眸。
-醉舞广寒宫阙外，扶摇直上破苍穹。
-明月照我意未尽，且邀清辉醉心田。"""),
-        HumanMessage("我希望在上面的返回中，添加一些关于仙人、侠客的内容"),
-    ]
-    # 添加系统提示
-    response = model.invoke(conversation)
-    pretty_print_ai_response(response)
+print("--" * 30 + " model传输多轮对话(系统+用户提示) " + "--" * 30)
+asyncio.run(main())
@@ -1,58 +1,9 @@
-import os
+from common.config import MODEL
+from common.llm import init_model
+from common.pretty import pretty_print_ai_response_prefix, pretty_print_ai_response_suffix
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
-
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.env')
-load_dotenv(config_path)
-
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model = os.getenv('MODEL')
-
-
-def pretty_print_ai_response_prefix(response_type="sync"):
-    separator = "=" * 60
-
-    print(f"\n{separator}")
-    if response_type == "stream":
-        print("🤖 AI 流式回复中...")
-    else:
-        print("🤖 AI 智能回复")
-    print(separator)
-
-
-def pretty_print_ai_response_suffix(response, token):
-    separator = "=" * 60
-    # 技术信息
-    print(f"\n{separator}")
-    print("📊 技术详情:")
-    print(f"  📁 类型: {type(response).__name__}")
-
-    # Token 使用情况
-    if hasattr(response, 'usage_metadata') and response.usage_metadata:
-        print(f"  💰 Token: {response.usage_metadata}")
-    elif hasattr(response, 'usage') and response.usage:
-        print(f"  💰 Token: {response.usage}")
-    else:
-        print(f"  💰 Token: {token}")
-
-    # 对象属性统计
-    attr_count = len([attr for attr in dir(response) if not attr.startswith('_')])
-    print(f"  🔍 属性数: {attr_count} 个")
-    print(separator)
-
-
-def init_model(model):
-    # 初始化 LLM Model
-    return init_chat_model(model=model,
-                           model_provider="openai",  # 指定模型厂商
-                           temperature=0.7,  # 温度，控制返回更稳定还是更有创造力的结果
-                           timeout=30,  # 设置超时时间，单位秒
-                           max_tokens=1000,  # 限制响应中的令牌总数，从而有效地控制输出的长度。
-                           max_retries=3,  # 最大失败重试次数
-                           )
+# 模型名称，config.env 由 common.config 统一加载
+model = MODEL
 
 
 def stream_call(model):
@@ -2,162 +2,143 @@
 结构化输出
 """
 
-import os
+import asyncio
+from functools import lru_cache
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import orjson
+from langchain_core.runnables import RunnableLambda
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import BaseModel, Field
+from typing_extensions import TypedDict, Annotated
 
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.env')
-load_dotenv(config_path)
+from common.config import MODEL
+from common.llm import init_model
 
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model = os.getenv('MODEL')
+# 模型名称，config.env 由 common.config 统一加载
+model = MODEL
 
 
-def pretty_print_ai_response_prefix(response_type="sync"):
-    separator = "=" * 60
+# 结构化输出的数据结构定义在模块顶层，类只会创建一次，pydantic 的校验器也只需要构建一次
+class Movie(BaseModel):
+    """A movie with details."""
+    title: str = Field(..., description="The title of the movie")
+    year: int = Field(..., description="The year the movie was released")
+    director: str = Field(..., description="The director of the movie")
+    rating: float = Field(..., description="The movie's rating out of 10")
 
-    print(f"\n{separator}")
-    if response_type == "stream":
-        print("🤖 AI 流式回复中...")
-    else:
-        print("🤖 AI 智能回复")
-    print(separator)
 
+class MovieDict(TypedDict):
+    """A movie with details."""
+    title: Annotated[str, ..., "The title of the movie"]
+    year: Annotated[int, ..., "The year the movie was released"]
+    director: Annotated[str, ..., "The director of the movie"]
+    rating: Annotated[float, ..., "The movie's rating out of 10"]
 
-def pretty_print_ai_response_suffix(response):
-    separator = "=" * 60
-    # 技术信息
-    print(f"\n{separator}")
-    print("📊 技术详情:")
-    print(f"  📁 类型: {type(response).__name__}")
 
-    # Token 使用情况
-    if hasattr(response, 'usage_metadata') and response.usage_metadata:
-        print(f"  💰 Token: {response.usage_metadata}")
-    elif hasattr(response, 'usage') and response.usage:
-        print(f"  💰 Token: {response.usage}")
-    else:
-        print(f"  💰 Token: 未返回")
-
-    # 对象属性统计
-    attr_count = len([attr for attr in dir(response) if not attr.startswith('_')])
-    print(f"  🔍 属性数: {attr_count} 个")
-    print(separator)
-
-
-def pretty_print_ai_response(response):
+@lru_cache(maxsize=8)
+def init_structured_model(model, schema):
     """
-    美化的 AI 响应输出
-    :param response: 大模型的返回
+    按 (模型名, 输出结构) 缓存绑定了结构化输出的模型，重复调用时无需再次将 schema 转换为 json
+    :param model: 模型名称
+    :param schema: 输出结构，如 Movie、MovieDict
     :return:
     """
-    pretty_print_ai_response_prefix("sync")
-
-    # 主要内容显示
-    print(f"\n💬 回复内容:")
-    if hasattr(response, 'content'):
-        print(response.content)
-    else:
-        print(str(response))
-
-    pretty_print_ai_response_suffix(response)
-
+    return init_model(model).with_structured_output(schema)
 
-def init_model(model):
-    # 初始化 LLM Model
-    return init_chat_model(model=model,
-                           model_provider="openai",  # 指定模型厂商
-                           temperature=0.7,  # 温度，控制返回更稳定还是更有创造力的结果
-                           timeout=30,  # 设置超时时间，单位秒
-                           max_tokens=1000,  # 限制响应中的令牌总数，从而有效地控制输出的长度。
-                           max_retries=3,  # 最大失败重试次数
-                           )
 
-
-def struct_output(model):
+async def struct_output(model):
     """
     Pydantic 模型提供最丰富的功能集，包括字段验证、描述和嵌套结构。
     :param model:
     :return:
     """
-    model = init_model(model)
-
-    from pydantic import BaseModel, Field
-    class Movie(BaseModel):
-        """A movie with details."""
-        title: str = Field(..., description="The title of the movie")
-        year: int = Field(..., description="The year the movie was released")
-        director: str = Field(..., description="The director of the movie")
-        rating: float = Field(..., description="The movie's rating out of 10")
+    model_with_structure = init_structured_model(model, Movie)
+    response = await model_with_structure.ainvoke("请提供周星驰的电影《功夫》的详细信息")
+    print(f"Pydantic: {response}")
 
-    model_with_structure = model.with_structured_output(Movie)
-    response = model_with_structure.invoke("请提供周星驰的电影《功夫》的详细信息")
-    print(response)
 
-
-def struct_output_v2(model):
+async def struct_output_v2(model):
     """
     Python 的 TypedDict 为 Pydantic 模型提供了一个更简单的替代方案，非常适合不需要运行时验证的情况。
     :param model:
     :return:
     """
-    model = init_model(model)
-
-    from typing_extensions import TypedDict, Annotated
-    class MovieDict(TypedDict):
-        """A movie with details."""
-        title: Annotated[str, ..., "The title of the movie"]
-        year: Annotated[int, ..., "The year the movie was released"]
-        director: Annotated[str, ..., "The director of the movie"]
-        rating: Annotated[float, ..., "The movie's rating out of 10"]
-
-    model_with_structure = model.with_structured_output(MovieDict)
-    response = model_with_structure.invoke("请提供周星驰的电影《功夫》的详细信息")
-    print(response)
+    model_with_structure = init_structured_model(model, MovieDict)
+    response = await model_with_structure.ainvoke("请提供周星驰的电影《功夫》的详细信息")
+    print(f"TypedDict: {response}")
+
+
+# json schema 定义，模块加载时创建一次，不在每次调用时重复构建
+MOVIE_JSON_SCHEMA = {
+    "title": "Movie",
+    "description": "A movie with details",
+    "type": "object",
+    "properties": {
+        "title": {
+            "type": "string",
+            "description": "The title of the movie"
+        },
+        "year": {
+            "type": "integer",
+            "description": "The year the movie was released"
+        },
+        "director": {
+            "type": "string",
+            "description": "The director of the movie"
+        },
+        "rating": {
+            "type": "number",
+            "description": "The movie's rating out of 10"
+        }
+    },
+    "required": ["title", "year", "director", "rating"]
+}
+
+# 对应 OpenAI 接口中的 response_format 参数，服务端按照 schema 约束生成 json
+MOVIE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": MOVIE_JSON_SCHEMA["title"],
+        "description": MOVIE_JSON_SCHEMA["description"],
+        "schema": MOVIE_JSON_SCHEMA,
+    },
+}
+
+
+def parse_json_content(message):
+    """
+    使用 orjson 解析模型返回的 json 文本，解析速度比标准库 json 快数倍
+    部分兼容 OpenAI 接口的服务（如智谱）会用 ```json 代码块包裹结果或附带说明文字，直接解析失败时回退到 LangChain 的 json 解析
+    :param message: 大模型返回的 AIMessage
+    :return: 解析后的字典
+    """
+    # content 也可能是内容块列表，统一取拼接后的文本
+    text = message.text
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return parse_json_markdown(text)
 
 
-def struct_output_v3(model):
+async def struct_output_v3(model):
     """
     json schema 的方式定义结构化返回
     :param model:
     :return:
     """
     model = init_model(model)
-    json_schema = {
-        "title": "Movie",
-        "description": "A movie with details",
-        "type": "object",
-        "properties": {
-            "title": {
-                "type": "string",
-                "description": "The title of the movie"
-            },
-            "year": {
-                "type": "integer",
-                "description": "The year the movie was released"
-            },
-            "director": {
-                "type": "string",
-                "description": "The director of the movie"
-            },
-            "rating": {
-                "type": "number",
-                "description": "The movie's rating out of 10"
-            }
-        },
-        "required": ["title", "year", "director", "rating"]
-    }
 
-    model_with_structure = model.with_structured_output(
-        json_schema,
-        method="json_schema",
-    )
-    response = model_with_structure.invoke("请提供周星驰的电影《功夫》的详细信息")
-    print(response)
+    # 等价于 model.with_structured_output(MOVIE_JSON_SCHEMA, method="json_schema")
+    # 这里手动绑定 response_format，并用 orjson 替换默认的 json 输出解析器
+    model_with_structure = model.bind(response_format=MOVIE_RESPONSE_FORMAT) | RunnableLambda(parse_json_content)
+    response = await model_with_structure.ainvoke("请提供周星驰的电影《功夫》的详细信息")
+    print(f"JSON Schema: {response}")
+
+
+async def main():
+    # 三种结构化输出方式的调用相互独立，并发执行，总耗时取决于最慢的一次调用
+    await asyncio.gather(struct_output(model), struct_output_v2(model), struct_output_v3(model))
 
 
 print("--" * 30 + " 结构化输出 " + "--" * 30)
-struct_output_v3(model)
+asyncio.run(main())
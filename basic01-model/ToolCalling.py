@@ -1,82 +1,23 @@
 """
 工具回调
 """
+import asyncio
 import datetime
-import os
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
 
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.env')
-load_dotenv(config_path)
+from common.config import MODEL
+from common.llm import init_model
+from common.pretty import pretty_print_ai_response
 
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model = os.getenv('MODEL')
+# 模型名称，config.env 由 common.config 统一加载
+model = MODEL
 
 
-def pretty_print_ai_response_prefix(response_type="sync"):
-    separator = "=" * 60
-
-    print(f"\n{separator}")
-    if response_type == "stream":
-        print("🤖 AI 流式回复中...")
-    else:
-        print("🤖 AI 智能回复")
-    print(separator)
-
-
-def pretty_print_ai_response_suffix(response):
-    separator = "=" * 60
-    # 技术信息
-    print(f"\n{separator}")
-    print("📊 技术详情:")
-    print(f"  📁 类型: {type(response).__name__}")
-
-    # Token 使用情况
-    if hasattr(response, 'usage_metadata') and response.usage_metadata:
-        print(f"  💰 Token: {response.usage_metadata}")
-    elif hasattr(response, 'usage') and response.usage:
-        print(f"  💰 Token: {response.usage}")
-    else:
-        print(f"  💰 Token: 未返回")
-
-    # 对象属性统计
-    attr_count = len([attr for attr in dir(response) if not attr.startswith('_')])
-    print(f"  🔍 属性数: {attr_count} 个")
-    print(separator)
-
-
-def pretty_print_ai_response(response):
-    """
-    美化的 AI 响应输出
-    :param response: 大模型的返回
-    :return:
-    """
-    pretty_print_ai_response_prefix("sync")
-
-    # 主要内容显示
-    print(f"\n💬 回复内容:")
-    if hasattr(response, 'content'):
-        print(response.content)
-    else:
-        print(str(response))
-
-    pretty_print_ai_response_suffix(response)
-
-
-def init_model(model):
-    # 初始化 LLM Model
-    return init_chat_model(model=model,
-                           model_provider="openai",  # 指定模型厂商
-                           temperature=0.7,  # 温度，控制返回更稳定还是更有创造力的结果
-                           timeout=30,  # 设置超时时间，单位秒
-                           max_tokens=1000,  # 限制响应中的令牌总数，从而有效地控制输出的长度。
-                           max_retries=3,  # 最大失败重试次数
-                           )
+# 本地时区在进程运行期间不会变化，模块加载时计算一次即可
+LOCAL_TZ = datetime.datetime.now(datetime.timezone.utc).astimezone().tzinfo
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S %Z'
 
 
 @tool
@@ -89,10 +30,9 @@ def now_time(area):
     try:
         print(f"进入工具调用 {area}")
         # 获取指定时区的当前时间
-        tz = datetime.timezone.utc if area.lower() == 'utc' else datetime.datetime.now(
-            datetime.timezone.utc).astimezone().tzinfo
+        tz = datetime.timezone.utc if area.lower() == 'utc' else LOCAL_TZ
         current_time = datetime.datetime.now(tz)
-        ans = f"{area} 当前时间是 {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}"
+        ans = f"{area} 当前时间是 {current_time.strftime(TIME_FORMAT)}"
         print(f"工具调用，返回：{ans}")
         return ans
     except Exception as e:
@@ -100,7 +40,11 @@ def now_time(area):
         return f"无法获取 {area} 的当前时间: {str(e)}"
 
 
-def tool_calling(model):
+# 工具名称 -> 工具，用于根据模型返回的 tool_call 找到需要执行的工具
+TOOLS_BY_NAME = {now_time.name: now_time}
+
+
+async def tool_calling(model):
     model = init_model(model)
 
     msg_list = []
@@ -110,27 +54,31 @@ def tool_calling(model):
     msg_list.append(HumanMessage("现在纽约几点了？"))
 
     # Step1: 调用大模型，回调工具获取当前时间
-    response = model_with_tools.invoke(msg_list)
+    response = await model_with_tools.ainvoke(msg_list)
 
     # step2: 执行工具并收集结果
+    # 工具调用的结果需要跟在发起调用的 AIMessage 之后回传给大模型
+    msg_list.append(response)
     for tool_call in response.tool_calls:
         print(f"工具调用: {tool_call['name']}")
         print(f"参数: {tool_call['args']}")
 
-        # 执行工具函数
-        if tool_call['name'] == 'now_time':
-            tool_result = now_time.invoke(tool_call)
-            print(f"工具调用结果: {tool_result}")
-            msg_list.append(tool_result)
+    # 模型一次返回多个工具调用时（如同时查询多个地区的时间），通过 asyncio.gather 并发执行，而不是逐个等待
+    tool_results = await asyncio.gather(
+        *(TOOLS_BY_NAME[tool_call['name']].ainvoke(tool_call) for tool_call in response.tool_calls)
+    )
+    for tool_result in tool_results:
+        print(f"工具调用结果: {tool_result}")
+    msg_list.extend(tool_results)
 
     # step3: 将返回结果回传给大模型
-    res = model.invoke(msg_list)
+    res = await model.ainvoke(msg_list)
     pretty_print_ai_response(res)
 
 
 print("--" * 30 + " 工具调用 " + "--" * 30)
 # 请注意，要选择一个支持tool的模型
-tool_calling("Qwen/Qwen3-8B")
+asyncio.run(tool_calling("Qwen/Qwen3-8B"))
 
 # 一个演示的示例
 '''
@@ -1,60 +1,63 @@
 """
 流式调用的场景演示
 """
-import os
-from pathlib import Path
+import sys
+import time
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+from common.config import MODEL
+from common.llm import init_model
 
-config_path = os.path.join(Path(__file__).resolve().parents[2], 'config.env')
-load_dotenv(config_path)
+# 模型名称，config.env 由 common.config 统一加载
+model = MODEL
 
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model = os.getenv('MODEL')
+
+# 流式输出的刷新策略：累计一定数量的 token 或超过一定时间间隔才写一次标准输出，减少 write/flush 系统调用
+FLUSH_TOKEN_COUNT = 32
+FLUSH_INTERVAL_SECONDS = 0.05
 
 
 def enhanced_stream_output(prompt, model):
     """增强版流式输出，支持更多控制选项"""
-    full_response = ""
+    # 完整回复的片段列表，结束后一次性拼接，避免字符串反复拼接带来的复制开销
+    parts = []
     token_stats = {"input": 0, "output": 0}
+    # 待输出的 token 缓冲区
+    buffer = []
+    last_flush = time.monotonic()
 
     print("🤖 AI正在思考中...")
     print("-" * 50)
 
     try:
         for chunk in model.stream(prompt):
-            # 实时输出内容
-            if hasattr(chunk, 'content') and chunk.content:
-                print(chunk.content, end='', flush=True)
-                full_response += chunk.content
+            # 实时输出内容，按批次写入标准输出
+            # AIMessageChunk 一定带有 content 属性，直接读取一次并复用，省去每个 token 的 hasattr 检查
+            content = chunk.content
+            if content:
+                buffer.append(content)
+                parts.append(content)
+                if len(buffer) >= FLUSH_TOKEN_COUNT or time.monotonic() - last_flush > FLUSH_INTERVAL_SECONDS:
+                    sys.stdout.write("".join(buffer))
+                    sys.stdout.flush()
+                    buffer.clear()
+                    last_flush = time.monotonic()
 
             # 收集token统计
-            if hasattr(chunk, 'usage_metadata'):
-                usage = chunk.usage_metadata
-                if usage:
-                    token_stats["input"] = usage.get("input_tokens", 0)
-                    token_stats["output"] = usage.get("output_tokens", 0)
+            usage = chunk.usage_metadata
+            if usage:
+                token_stats["input"] = usage.get("input_tokens", 0)
+                token_stats["output"] = usage.get("output_tokens", 0)
 
     except KeyboardInterrupt:
         print("\n\n⚠️  用户中断了流式输出")
     except Exception as e:
         print(f"\n\n❌ 流式调用出错: {e}")
+    finally:
+        # 输出缓冲区中剩余的内容
+        sys.stdout.write("".join(buffer))
+        sys.stdout.flush()
 
-    return full_response, token_stats
-
-
-def init_model(model):
-    # 初始化 LLM Model
-    return init_chat_model(model=model,
-                           model_provider="openai",  # 指定模型厂商
-                           temperature=0.7,  # 温度，控制返回更稳定还是更有创造力的结果
-                           timeout=30,  # 设置超时时间，单位秒
-                           max_tokens=1000,  # 限制响应中的令牌总数，从而有效地控制输出的长度。
-                           max_retries=3,  # 最大失败重试次数
-                           )
+    return "".join(parts), token_stats
 
 
 def long_text_streaming(model_name):
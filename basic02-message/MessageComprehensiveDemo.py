@@ -3,83 +3,42 @@ Message全面使用示例
 展示SystemMessage、HumanMessage、AIMessage、ToolMessage的各种使用场景
 """
 
-import os
+import ast
+import asyncio
 import json
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import operator
+import sys
+from functools import lru_cache
 from langchain_core.messages import (
     SystemMessage, 
     HumanMessage, 
     AIMessage, 
-    ToolMessage,
-    FunctionMessage
+    trim_messages,
 )
+from langchain_core.messages.utils import count_tokens_approximately
 from langchain_core.tools import tool
 
-# 加载配置
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config-zhipu.env')
-load_dotenv(config_path)
-
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model_name = os.getenv('MODEL')
-
-
-def init_model(model):
-    """初始化模型"""
-    return init_chat_model(
-        model=model,
-        model_provider="openai",
-        temperature=0.7,
-        timeout=30,
-        max_tokens=1000,
-        max_retries=3,
-    )
-
-
-def pretty_print_ai_response(response):
-    """美化AI响应输出"""
-    separator = "=" * 60
-    print(f"\n{separator}")
-    print("🤖 AI 智能回复")
-    print(separator)
-    
-    print(f"\n💬 回复内容:")
-    if hasattr(response, 'content'):
-        print(response.content)
-    else:
-        print(str(response))
-        
-    print(f"\n{separator}")
-    print("📊 技术详情:")
-    print(f"  📁 类型: {type(response).__name__}")
-    
-    if hasattr(response, 'usage_metadata') and response.usage_metadata:
-        print(f"  💰 Token: {response.usage_metadata}")
-    elif hasattr(response, 'usage') and response.usage:
-        print(f"  💰 Token: {response.usage}")
-    else:
-        print("  💰 Token: 未提供")
-    print(separator)
+from common import PROJECT_ROOT
+from common.env import load_env
+from common.llm import init_model
+from common.pretty import pretty_print_ai_response
+
+# 加载配置，密钥与访问地址在创建模型时显式传入，不再写入 OPENAI_* 环境变量
+config_path = PROJECT_ROOT / 'config-zhipu.env'
+env = load_env(config_path)
+model_name = env["model"]
 
 
 def system_message_examples():
-    """SystemMessage使用示例"""
-    print("=== SystemMessage使用示例 ===")
-    
-    model = init_model(model_name)
-    
+    """
+    SystemMessage使用示例
+    :return: (标题, 消息列表) 组成的列表，由 run_examples 统一批量调用模型
+    """
     # 示例1：角色设定
-    print("1. 角色设定示例：")
     system_role = SystemMessage("你是一位资深的Python开发专家，擅长代码审查和最佳实践指导")
     human_code = HumanMessage("请帮我审查这段代码：\n```python\ndef calculate_sum(numbers):\n    result = 0\n    for num in numbers:\n        result += num\n    return result\n```")
     
-    response1 = model.invoke([system_role, human_code])
-    pretty_print_ai_response(response1)
-    
     # 示例2：行为约束
-    print("\n2. 行为约束示例：")
     system_constraint = SystemMessage("""
     你是一个严格的语言老师，请用以下规则回复：
     1. 必须使用正式、礼貌的语言
@@ -88,67 +47,57 @@ def system_message_examples():
     """)
     human_question = HumanMessage("世界上最高的山是什么？")
     
-    response2 = model.invoke([system_constraint, human_question])
-    pretty_print_ai_response(response2)
-    
     # 示例3：多角色切换
-    print("\n3. 多角色切换示例：")
     system_poet = SystemMessage("你现在是一位古代诗人，说话要有古风韵味")
     human_topic = HumanMessage("请写一首关于春天的诗")
-    
-    response3 = model.invoke([system_poet, human_topic])
-    pretty_print_ai_response(response3)
+
+    return [
+        ("=== SystemMessage使用示例 ===\n1. 角色设定示例：", [system_role, human_code]),
+        ("\n2. 行为约束示例：", [system_constraint, human_question]),
+        ("\n3. 多角色切换示例：", [system_poet, human_topic]),
+    ]
 
 
 def human_message_examples():
-    """HumanMessage使用示例"""
-    print("\n=== HumanMessage使用示例 ===")
-    
-    model = init_model(model_name)
-    
+    """
+    HumanMessage使用示例
+    :return: (标题, 消息列表) 组成的列表，由 run_examples 统一批量调用模型
+    """
     # 示例1：基础问答
-    print("1. 基础问答：")
     question = HumanMessage("Python中列表和元组有什么区别？")
-    response = model.invoke([question])
-    pretty_print_ai_response(response)
     
     # 示例2：带上下文的提问
-    print("\n2. 带上下文的提问：")
     context = SystemMessage("你正在帮助用户学习数据结构")
     question_with_context = HumanMessage("能详细解释一下二叉树的遍历方式吗？")
-    response = model.invoke([context, question_with_context])
-    pretty_print_ai_response(response)
     
     # 示例3：多轮对话延续
-    print("\n3. 多轮对话延续：")
     conversation = [
         HumanMessage("我想学习机器学习"),
         AIMessage("很好的选择！机器学习是人工智能的重要分支。你对哪个方面特别感兴趣？"),
         HumanMessage("我想先了解监督学习和无监督学习的区别")
     ]
-    response = model.invoke(conversation)
-    pretty_print_ai_response(response)
+
+    return [
+        ("\n=== HumanMessage使用示例 ===\n1. 基础问答：", [question]),
+        ("\n2. 带上下文的提问：", [context, question_with_context]),
+        ("\n3. 多轮对话延续：", conversation),
+    ]
 
 
 def ai_message_examples():
-    """AIMessage使用示例"""
-    print("\n=== AIMessage使用示例 ===")
-    
-    model = init_model(model_name)
-    
+    """
+    AIMessage使用示例
+    :return: (标题, 消息列表) 组成的列表，由 run_examples 统一批量调用模型
+    """
     # 示例1：模拟历史对话
-    print("1. 模拟历史对话：")
     conversation_history = [
         SystemMessage("你是一个旅游咨询助手"),
         HumanMessage("我想去北京旅游，有什么推荐吗？"),
         AIMessage("北京有很多值得游览的地方！推荐您参观故宫、天坛、颐和园等历史文化景点，还有798艺术区等现代文化场所。"),
         HumanMessage("这些地方的门票价格怎么样？")
     ]
-    response = model.invoke(conversation_history)
-    pretty_print_ai_response(response)
     
     # 示例2：带有思考过程的AI回复
-    print("\n2. 带有思考过程的AI回复：")
     complex_conversation = [
         SystemMessage("你是一个逻辑推理专家，请展示你的思考过程"),
         HumanMessage("如果所有的猫都是动物，汤姆是猫，那么汤姆是什么？"),
@@ -169,52 +118,139 @@ def ai_message_examples():
         """),
         HumanMessage("那如果我还告诉你汤姆会飞呢？")
     ]
-    response = model.invoke(complex_conversation)
-    pretty_print_ai_response(response)
+
+    return [
+        ("\n=== AIMessage使用示例 ===\n1. 模拟历史对话：", conversation_history),
+        ("\n2. 带有思考过程的AI回复：", complex_conversation),
+    ]
 
 
 # 定义测试工具
-@tool
-def get_weather(city: str) -> str:
-    """获取城市天气信息"""
-    # 模拟天气数据
-    weather_data = {
+# 模拟天气数据，模块加载时构建一次，城市名作为高频查找的键统一驻留（intern）
+WEATHER_DATA = {
+    sys.intern(city): weather for city, weather in {
         "北京": "晴天，气温-2°C到8°C，西北风3-4级",
         "上海": "多云，气温3°C到12°C，东南风2-3级",
         "广州": "小雨，气温15°C到22°C，微风"
-    }
-    return weather_data.get(city, f"暂无{city}的天气信息")
+    }.items()
+}
+
+
+@tool
+def get_weather(city: str) -> str:
+    """获取城市天气信息"""
+    return WEATHER_DATA.get(city, f"暂无{city}的天气信息")
+
+
+# 乘方的结果随指数呈指数级增长，如 9**9**9 会长时间占满 CPU，因此限制底数与指数的大小
+MAX_POW_BASE = 10 ** 6
+MAX_POW_EXPONENT = 100
+
+
+def bounded_pow(base, exponent):
+    """限制操作数大小的乘方，超出范围时拒绝计算"""
+    if abs(base) > MAX_POW_BASE or abs(exponent) > MAX_POW_EXPONENT:
+        raise ValueError(f"乘方的操作数过大: {base} ** {exponent}")
+    return operator.pow(base, exponent)
+
+
+# 表达式计算支持的运算符
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: bounded_pow,
+}
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+@lru_cache(maxsize=256)
+def compile_expression(expression):
+    """解析表达式为语法树，相同的表达式只解析一次"""
+    return ast.parse(expression, mode='eval').body
+
+
+def evaluate_node(node):
+    """只对数字常量与四则运算求值，其他任何语法（函数调用、属性访问、变量等）都直接拒绝"""
+    # bool 是 int 的子类，需要单独排除，避免 True + 1 这类表达式被当作数字计算
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        return BINARY_OPERATORS[type(node.op)](evaluate_node(node.left), evaluate_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        return UNARY_OPERATORS[type(node.op)](evaluate_node(node.operand))
+    raise ValueError(f"不支持的表达式: {ast.dump(node)}")
 
 
 @tool
 def calculate(expression: str) -> str:
     """计算数学表达式"""
     try:
-        # 简单的安全计算（实际项目中应使用更安全的方式）
-        result = eval(expression, {"__builtins__": {}}, {})
+        # 基于语法树求值，不经过 eval 的编译执行流程，也不会执行表达式中的任意代码
+        result = evaluate_node(compile_expression(expression))
         return f"{expression} = {result}"
-    except:
+    # 逐个节点递归求值，过长或嵌套过深的表达式会触发 RecursionError，同样作为无法计算处理
+    except (SyntaxError, ValueError, ArithmeticError, RecursionError):
         return f"无法计算表达式: {expression}"
 
 
-def tool_message_examples():
+# 工具列表与按名称索引的映射在模块加载时构建一次，执行工具调用时直接按名称查找，不需要逐个 if/elif 判断
+# 工具名称作为键统一驻留，查找时字符串比较可以直接走指针相等的快速路径
+TOOLS = [get_weather, calculate]
+TOOL_MAP = {sys.intern(t.name): t for t in TOOLS}
+
+
+@lru_cache(maxsize=4)
+def init_model_with_tools(model):
+    """绑定工具的模型，按模型名缓存，工具的 schema 只需要转换一次"""
+    return init_model(model, api_key=env["api_key"], base_url=env["base_url"]).bind_tools(TOOLS)
+
+
+def normalize_tool_calls(message):
+    """
+    一次性补齐缺失的工具调用 id，并用补齐后的工具调用重建 AIMessage
+    后续执行工具与组装对话都使用返回的消息，ToolMessage 的 tool_call_id 与对话中 AIMessage 的工具调用 id 始终一致
+    :param message: 模型返回的 AIMessage
+    :return: 工具调用 id 齐全的 AIMessage
+    """
+    if all(tool_call.get('id') for tool_call in message.tool_calls):
+        return message
+    calls = [{**tool_call, 'id': tool_call.get('id') or f"tc_{i}"} for i, tool_call in enumerate(message.tool_calls)]
+    return message.model_copy(update={"tool_calls": calls})
+
+
+async def execute_tool_calls(tool_calls):
+    """
+    并发执行模型在一次响应中返回的多个工具调用，总耗时取决于最慢的一个工具
+    :param tool_calls: 已经通过 normalize_tool_calls 补齐 id 的工具调用列表
+    :return: 与工具调用一一对应的 ToolMessage 列表
+    """
+    return await asyncio.gather(*(TOOL_MAP[tool_call['name']].ainvoke(tool_call) for tool_call in tool_calls))
+
+
+async def tool_message_examples():
     """ToolMessage使用示例"""
     print("\n=== ToolMessage使用示例 ===")
     
-    model = init_model(model_name)
+    model = init_model(model_name, api_key=env["api_key"], base_url=env["base_url"])
+    # 绑定工具到模型
+    model_with_tools = init_model_with_tools(model_name)
     
     # 示例1：工具调用基础示例
     print("1. 工具调用基础示例：")
     
-    # 绑定工具到模型
-    model_with_tools = model.bind_tools([get_weather, calculate])
-    
     # 用户询问天气
     user_query = HumanMessage("北京今天天气怎么样？")
     
     # 第一步：AI决定是否需要调用工具
     print("第一步：AI分析是否需要工具")
-    response = model_with_tools.invoke([user_query])
+    response = normalize_tool_calls(await model_with_tools.ainvoke([user_query]))
     
     if response.tool_calls:
         print("发现工具调用需求：")
@@ -222,21 +258,15 @@ def tool_message_examples():
             print(f"  工具名称: {tool_call['name']}")
             print(f"  参数: {tool_call['args']}")
             
-            # 执行工具调用
-            if tool_call['name'] == 'get_weather':
-                tool_result = get_weather.invoke(tool_call)
-                print(f"  执行结果: {tool_result}")
-                
-                # 创建ToolMessage
-                tool_message = ToolMessage(
-                    content=tool_result,
-                    tool_call_id=tool_call['id'] if 'id' in tool_call else 'tool_1'
-                )
-                
-                # 第二步：AI基于工具结果生成最终回答
-                print("\n第二步：AI生成最终回答")
-                final_response = model.invoke([user_query, response, tool_message])
-                pretty_print_ai_response(final_response)
+        # 执行工具调用，传入完整的 tool_call 时直接返回对应的 ToolMessage
+        tool_messages = await execute_tool_calls(response.tool_calls)
+        for tool_message in tool_messages:
+            print(f"  执行结果: {tool_message.content}")
+        
+        # 第二步：AI基于工具结果生成最终回答
+        print("\n第二步：AI生成最终回答")
+        final_response = await model.ainvoke([user_query, response, *tool_messages])
+        pretty_print_ai_response(final_response)
     
     # 示例2：多工具调用
     print("\n2. 多工具调用示例：")
@@ -244,40 +274,29 @@ def tool_message_examples():
     complex_query = HumanMessage("帮我计算一下(25+15)*2，然后查询上海的天气")
     
     print("AI分析复杂请求...")
-    response = model_with_tools.invoke([complex_query])
+    response = normalize_tool_calls(await model_with_tools.ainvoke([complex_query]))
     
     if response.tool_calls:
-        tool_messages = []
-        
         for tool_call in response.tool_calls:
             print(f"调用工具: {tool_call['name']}")
-            
-            if tool_call['name'] == 'calculate':
-                result = calculate.invoke(tool_call)
-                tool_msg = ToolMessage(content=result, tool_call_id=tool_call.get('id', 'calc_1'))
-                tool_messages.append(tool_msg)
-                print(f"计算结果: {result}")
-                
-            elif tool_call['name'] == 'get_weather':
-                result = get_weather.invoke(tool_call)
-                tool_msg = ToolMessage(content=result, tool_call_id=tool_call.get('id', 'weather_1'))
-                tool_messages.append(tool_msg)
-                print(f"天气信息: {result}")
+        
+        # 多个工具调用相互独立，并发执行
+        tool_messages = await execute_tool_calls(response.tool_calls)
+        for tool_message in tool_messages:
+            print(f"执行结果: {tool_message.content}")
         
         # 基于所有工具结果生成最终回答
-        conversation = [complex_query, response] + tool_messages
-        final_response = model.invoke(conversation)
+        conversation = [complex_query, response, *tool_messages]
+        final_response = await model.ainvoke(conversation)
         pretty_print_ai_response(final_response)
 
 
 def mixed_message_scenarios():
-    """混合消息类型场景示例"""
-    print("\n=== 混合消息类型场景示例 ===")
-    
-    model = init_model(model_name)
-    
+    """
+    混合消息类型场景示例
+    :return: (标题, 消息列表) 组成的列表，这些示例的回复较长，由 stream_and_print 流式输出
+    """
     # 场景1：角色扮演游戏
-    print("场景1：角色扮演游戏")
     rpg_scenario = [
         SystemMessage("""
         游戏设定：你是一位中世纪的骑士导师
@@ -291,11 +310,7 @@ def mixed_message_scenarios():
         HumanMessage("我愿意接受任何考验！"),
     ]
     
-    response = model.invoke(rpg_scenario)
-    pretty_print_ai_response(response)
-    
     # 场景2：技术支持对话
-    print("\n场景2：技术支持对话")
     support_scenario = [
         SystemMessage("你是一位专业的Python技术支持工程师，善于解决各种编程问题"),
         HumanMessage("我的Python程序运行时报错：ImportError: No module named 'requests'"),
@@ -303,11 +318,7 @@ def mixed_message_scenarios():
         HumanMessage("安装后还是报同样的错误怎么办？"),
     ]
     
-    response = model.invoke(support_scenario)
-    pretty_print_ai_response(response)
-    
     # 场景3：创意写作助手
-    print("\n场景3：创意写作助手")
     writing_scenario = [
         SystemMessage("你是一位经验丰富的科幻小说作家，善于构建复杂的世界观"),
         HumanMessage("我想写一个关于时间旅行的故事，能给我一些灵感吗？"),
@@ -331,19 +342,20 @@ def mixed_message_scenarios():
         """),
         HumanMessage("听起来很棒！那主角应该是什么身份比较好？")
     ]
-    
-    response = model.invoke(writing_scenario)
-    pretty_print_ai_response(response)
+
+    return [
+        ("\n=== 混合消息类型场景示例 ===\n场景1：角色扮演游戏", rpg_scenario),
+        ("\n场景2：技术支持对话", support_scenario),
+        ("\n场景3：创意写作助手", writing_scenario),
+    ]
 
 
 def advanced_message_patterns():
-    """高级消息模式示例"""
-    print("\n=== 高级消息模式示例 ===")
-    
-    model = init_model(model_name)
-    
+    """
+    高级消息模式示例
+    :return: (标题, 消息列表) 组成的列表，这些示例的回复较长，由 stream_and_print 流式输出
+    """
     # 模式1：思维链推理 (Chain-of-Thought)
-    print("模式1：思维链推理")
     cot_pattern = [
         SystemMessage("你是一个逻辑推理专家，请分步骤思考问题"),
         HumanMessage("如果A>B，B>C，C>D，那么A和D的关系是什么？"),
@@ -368,11 +380,7 @@ def advanced_message_patterns():
         HumanMessage("很好！那如果是A≥B，B≥C，C≥D呢？")
     ]
     
-    response = model.invoke(cot_pattern)
-    pretty_print_ai_response(response)
-    
     # 模式2：自我反思机制
-    print("\n模式2：自我反思机制")
     reflection_pattern = [
         SystemMessage("你是一个善于自我反思的AI助手，请在回答后评估自己的回答质量"),
         HumanMessage("请解释什么是递归函数"),
@@ -401,9 +409,125 @@ def advanced_message_patterns():
         """),
         HumanMessage("你的解释还可以更详细一些")
     ]
-    
-    response = model.invoke(reflection_pattern)
-    pretty_print_ai_response(response)
+
+    return [
+        ("\n=== 高级消息模式示例 ===\n模式1：思维链推理", cot_pattern),
+        ("\n模式2：自我反思机制", reflection_pattern),
+    ]
+
+
+# 合并提问：共享的系统提示词 + 编号的问题列表 + 输出格式约定
+TUPLE_BATCH_SYSTEM_PROMPT = "你是一个知识渊博的助手，回答简洁准确"
+TUPLE_BATCH_INSTRUCTION = "请分别回答下面 {count} 个相互独立的问题，只返回一个包含 {count} 个字符串的 JSON 数组，按顺序对应每个问题的回答，不要输出其他内容。\n{questions}"
+
+
+async def tuple_batch_example(model):
+    """
+    合并提问示例
+    多个相互独立、且共用同一系统提示词的简单问题，合并为一次请求：系统提示词只发送一次，也省去了多次网络往返
+    问题之间会共享上下文，只适用于对相互影响不敏感的场景
+    :param model: LLM Model
+    :return:
+    """
+    print("\n=== 合并提问示例 ===")
+    questions = [
+        "Python中列表和元组有什么区别？",
+        "HTTP 和 HTTPS 的主要区别是什么？",
+        "什么是递归函数？",
+    ]
+    numbered = "\n".join(f"{i}) {question}" for i, question in enumerate(questions, 1))
+    response = await model.ainvoke([
+        SystemMessage(TUPLE_BATCH_SYSTEM_PROMPT),
+        HumanMessage(TUPLE_BATCH_INSTRUCTION.format(count=len(questions), questions=numbered)),
+    ])
+
+    try:
+        answers = json.loads(response.content)
+    except json.JSONDecodeError:
+        # 模型没有按约定返回 JSON 时，直接展示原始回复
+        pretty_print_ai_response(response)
+        return
+
+    for i, (question, answer) in enumerate(zip(questions, answers), 1):
+        print(f"{i}. {question}\n   {answer}")
+
+
+# 对话历史的 token 上限，超出时只保留最近的消息（系统提示词始终保留），请求体积不会随对话轮数无限增长
+MAX_HISTORY_TOKENS = 2000
+
+
+def trim_history(messages):
+    """
+    按 token 预算截断对话历史
+    使用近似计数，不需要为每次截断加载分词器
+    :param messages: 消息列表
+    :return:
+    """
+    return trim_messages(messages,
+                         max_tokens=MAX_HISTORY_TOKENS,
+                         token_counter=count_tokens_approximately,
+                         strategy="last",
+                         include_system=True,
+                         start_on="human")
+
+
+async def run_examples(model, examples):
+    """
+    批量执行示例中相互独立的模型调用
+    abatch 内部通过 asyncio.gather 并发发起请求，总耗时从各次调用之和降为最慢的一次，结果按示例顺序返回
+    :param model: LLM Model
+    :param examples: (标题, 消息列表) 组成的列表
+    :return:
+    """
+    responses = await model.abatch([trim_history(messages) for _, messages in examples], config={"max_concurrency": 8})
+    for (title, _), response in zip(examples, responses):
+        print(title)
+        pretty_print_ai_response(response)
+
+
+# 流式输出时每累积多少个片段写一次标准输出，减少 write/flush 的次数
+STREAM_FLUSH_CHUNKS = 16
+
+
+async def stream_and_print(model, messages):
+    """
+    流式输出长文本回复，首个片段到达即开始输出，不需要等待完整生成
+    :param model: LLM Model
+    :param messages: 消息列表
+    :return:
+    """
+    buffer = []
+    async for chunk in model.astream(trim_history(messages)):
+        buffer.append(chunk.content)
+        if len(buffer) >= STREAM_FLUSH_CHUNKS:
+            sys.stdout.write("".join(buffer))
+            sys.stdout.flush()
+            buffer.clear()
+    sys.stdout.write("".join(buffer) + "\n")
+    sys.stdout.flush()
+
+
+async def main():
+    model = init_model(model_name, api_key=env["api_key"], base_url=env["base_url"])
+
+    # 汇总回复较短的示例，一次批量调用模型
+    all_examples = [
+        *system_message_examples(),
+        *human_message_examples(),
+        *ai_message_examples(),
+    ]
+    await run_examples(model, all_examples)
+
+    # 多个独立的简单问题合并为一次请求
+    await tuple_batch_example(model)
+
+    # 回复较长的示例逐个流式输出，边生成边展示
+    for title, messages in [*mixed_message_scenarios(), *advanced_message_patterns()]:
+        print(title)
+        await stream_and_print(model, messages)
+
+    # 工具调用示例的后续请求依赖工具执行结果，单独运行
+    await tool_message_examples()
 
 
 if __name__ == "__main__":
@@ -411,16 +535,11 @@ if __name__ == "__main__":
     print("=" * 50)
     
     try:
-        # 运行各个示例
-        system_message_examples()
-        human_message_examples()
-        ai_message_examples()
-        tool_message_examples()
-        mixed_message_scenarios()
-        advanced_message_patterns()
+        # 所有示例在同一个事件循环中运行，异步连接池只绑定一次
+        asyncio.run(main())
         
         print("\n✅ 所有Message使用示例演示完毕！")
         
     except Exception as e:
         print(f"❌ 运行出错: {e}")
-        print("请检查配置文件和网络连接")
\ No newline at end of file
+        print("请检查配置文件和网络连接")
@@ -4,25 +4,66 @@ Mustache模板使用示例
 """
 
 from langchain_core.prompts import PromptTemplate
+from langchain_core.utils import mustache
 
 
-def basic_mustache_example():
-    """基础mustache模板示例"""
-    print("=== 基础mustache模板示例 ===")
-    
-    template = """
+class CompiledMustache:
+    """
+    预编译的mustache模板
+    创建时把模板拆分为 token 列表，之后每次渲染直接遍历这些 token，不再重新解析模板字符串，
+    适合同一模板反复渲染、且不需要 PromptTemplate 的 Runnable 接口的纯文本场景
+    """
+
+    def __init__(self, template, escape=True):
+        """
+        :param template: mustache模板
+        :param escape: 是否对 {{var}} 做HTML转义；提示词不是HTML，可以关闭转义，
+                       编译时把所有 {{var}} 直接转换为 {{{var}}}，渲染时不再逐字符扫描特殊字符
+        """
+        self.template = template
+        tokens = mustache.tokenize(template)
+        if not escape:
+            tokens = (("no escape", key) if tag == "variable" else (tag, key) for tag, key in tokens)
+        self._tokens = list(tokens)
+
+    def format(self, **kwargs):
+        return mustache.render(self._tokens, kwargs)
+
+
+def flatten(data, prefix=''):
+    """
+    展开嵌套字典：嵌套字段以 父键_子键 的形式放到顶层，渲染时直接按键取值，不需要按 '.' 拆分后逐层查找
+    嵌套字典本身也会保留，仍然可以用于 {{#section}} 条件判断
+    :param data: 嵌套的数据字典
+    :param prefix: 键的前缀
+    :return:
+    """
+    flat = {}
+    for key, value in data.items():
+        flat_key = f"{prefix}{key}"
+        flat[flat_key] = value
+        if isinstance(value, dict):
+            flat.update(flatten(value, flat_key + '_'))
+    return flat
+
+
+# 各示例的模板定义在模块顶层，模板字符串只在模块加载时解析、校验一次，示例函数中直接复用
+BASIC_PROMPT = PromptTemplate(
+    template="""
 你是一个起名大师，请为{{gender}}孩起名。
 孩子信息：{{info}}
 要求：返回5个名字及寓意。
-"""
-    
-    prompt_template = PromptTemplate(
-        template=template,
-        template_format="mustache",
-        input_variables=["gender", "info"]
-    )
+""",
+    template_format="mustache",
+    input_variables=["gender", "info"]
+)
+
+
+def basic_mustache_example():
+    """基础mustache模板示例"""
+    print("=== 基础mustache模板示例 ===")
     
-    prompt = prompt_template.format(
+    prompt = BASIC_PROMPT.format(
         gender="女",
         info="26年2月6日出生，姓钱"
     )
@@ -31,12 +72,8 @@ def basic_mustache_example():
     print()
 
 
-def nested_object_example():
-    """嵌套对象示例"""
-    print("=== 嵌套对象示例 ===")
-
-    
-    template = """
+NESTED_OBJECT_PROMPT = PromptTemplate(
+    template="""
 ---------------------------
 {{#child}}  {{! 嵌套对象开始：整个child对象作为上下文 }}
 姓名：{{name}}  {{! 访问child.name }}
@@ -55,13 +92,15 @@ def nested_object_example():
 
 请根据以上信息起名。
 ---------------------------
-"""
-    
-    prompt_template = PromptTemplate(
-        template=template,
-        template_format="mustache",
-        input_variables=["child"]
-    )
+""",
+    template_format="mustache",
+    input_variables=["child"]
+)
+
+
+def nested_object_example():
+    """嵌套对象示例"""
+    print("=== 嵌套对象示例 ===")
     
     data = {
         "name": "小宝贝",
@@ -76,7 +115,7 @@ def nested_object_example():
         }
     }
     
-    prompt = prompt_template.format(child=data)
+    prompt = NESTED_OBJECT_PROMPT.format(child=data)
     print("有父母信息的情况：")
     print(prompt)
     
@@ -92,17 +131,15 @@ def nested_object_example():
         "parent": None  # parent为None，触发{{^parent}}条件
     }
     
-    prompt_no_parent = prompt_template.format(child=data_no_parent)
+    prompt_no_parent = NESTED_OBJECT_PROMPT.format(child=data_no_parent)
     print(prompt_no_parent)
     print()
 
 
-def conditional_rendering_example():
-    """条件渲染示例"""
-    print("=== 条件渲染示例 ===")
-    # {{#}}} 表示为真的时候执行，对应的 {{/}} 表示条件结束
-    # {{^}} 表示非真的时候执行，同样的 {{/}} 表示条件结束
-    template = """
+# {{#}}} 表示为真的时候执行，对应的 {{/}} 表示条件结束
+# {{^}} 表示非真的时候执行，同样的 {{/}} 表示条件结束
+CONDITIONAL_PROMPT = PromptTemplate(
+    template="""
 {{#is_vip}}
 VIP客户专属服务：
 姓名：{{name}}
@@ -114,16 +151,18 @@ VIP客户专属服务：
 姓名：{{name}}
 欢迎使用我们的基础服务
 {{/is_vip}}
-"""
-    
-    prompt_template = PromptTemplate(
-        template=template,
-        template_format="mustache",
-        input_variables=["is_vip", "name", "level", "privileges"]
-    )
+""",
+    template_format="mustache",
+    input_variables=["is_vip", "name", "level", "privileges"]
+)
+
+
+def conditional_rendering_example():
+    """条件渲染示例"""
+    print("=== 条件渲染示例 ===")
     
     # VIP用户
-    vip_prompt = prompt_template.format(
+    vip_prompt = CONDITIONAL_PROMPT.format(
         is_vip=True,
         name="张三",
         level="钻石会员",
@@ -133,7 +172,7 @@ VIP客户专属服务：
     print(vip_prompt)
     
     # 普通用户
-    regular_prompt = prompt_template.format(
+    regular_prompt = CONDITIONAL_PROMPT.format(
         is_vip=False,
         name="李四",
         level="",  # 不会被使用
@@ -144,11 +183,8 @@ VIP客户专属服务：
     print()
 
 
-def list_iteration_example():
-    """列表迭代示例"""
-    print("=== 列表迭代示例 ===")
-    
-    template = """
+# 列表、嵌套列表的渲染需要遍历较多的 token，使用预编译的模板；生成的是提示词而非HTML，不需要转义
+LIST_ITERATION_PROMPT = CompiledMustache(escape=False, template="""
 可选的名字：
 {{#names}}
 {{index}}. {{name}} - {{meaning}}
@@ -156,13 +192,12 @@ def list_iteration_example():
 {{^names}}
 暂无推荐名字
 {{/names}}
-"""
-    
-    prompt_template = PromptTemplate(
-        template=template,
-        template_format="mustache",
-        input_variables=["names"]
-    )
+""")
+
+
+def list_iteration_example():
+    """列表迭代示例"""
+    print("=== 列表迭代示例 ===")
     
     name_list = [
         {"index": 1, "name": "钱思雨", "meaning": "思绪如雨，温润如玉"},
@@ -172,45 +207,43 @@ def list_iteration_example():
         {"index": 5, "name": "钱梦瑶", "meaning": "美梦成真，瑶池仙境"}
     ]
     
-    prompt = prompt_template.format(names=name_list)
+    prompt = LIST_ITERATION_PROMPT.format(names=name_list)
     print(prompt)
     print()
 
 
-def partial_template_example():
-    """部分模板示例（模拟）"""
-    print("=== 部分模板示例 ===")
-    
-    # 注意：LangChain的PromptTemplate对mustache的部分模板支持有限
-    # 这里展示一种变通的方法
-    
-    header_template = """
+# 注意：LangChain的PromptTemplate对mustache的部分模板支持有限
+# 这里展示一种变通的方法
+HEADER_TEMPLATE = """
 {{#header}}
 ================================================
 {{title}}
 ================================================
 {{/header}}
 """
-    
-    content_template = """
+
+CONTENT_TEMPLATE = """
 {{#content}}
 {{message}}
 {{/content}}
 """
-    
-    # 组合使用
-    full_template = header_template + content_template + """
+
+# 组合使用
+PARTIAL_PROMPT = PromptTemplate(
+    template=HEADER_TEMPLATE + CONTENT_TEMPLATE + """
 {{#footer}}
 ------------------------------------------------
 {{signature}}
 {{/footer}}
-"""
-    
-    prompt_template = PromptTemplate(
-        template=full_template,
-        template_format="mustache",
-        input_variables=["header", "content", "footer"]
-    )
+""",
+    template_format="mustache",
+    input_variables=["header", "content", "footer"]
+)
+
+
+def partial_template_example():
+    """部分模板示例（模拟）"""
+    print("=== 部分模板示例 ===")
     
     data = {
         "header": {
@@ -224,11 +257,22 @@ def partial_template_example():
         }
     }
     
-    prompt = prompt_template.format(**data)
+    prompt = PARTIAL_PROMPT.format(**data)
     print(prompt)
     print()
 
 
+ESCAPE_PROMPT = PromptTemplate(
+    template="""
+原始内容：{{content}}        {{! 默认HTML转义：特殊字符会被转义为HTML实体 }}
+转义内容：{{{content}}}     {{! 无转义输出：内容原样显示，包括HTML标签 }}
+HTML转义：{{&content}}      {{! 同样无转义：&符号是{{{}}}的简写形式 }}
+""",
+    template_format="mustache",
+    input_variables=["content"]
+)
+
+
 def escape_example():
     """转义示例
     
@@ -241,20 +285,8 @@ def escape_example():
     """
     print("=== 转义示例 ===")
     
-    template = """
-原始内容：{{content}}        {{! 默认HTML转义：特殊字符会被转义为HTML实体 }}
-转义内容：{{{content}}}     {{! 无转义输出：内容原样显示，包括HTML标签 }}
-HTML转义：{{&content}}      {{! 同样无转义：&符号是{{{}}}的简写形式 }}
-"""
-    
-    prompt_template = PromptTemplate(
-        template=template,
-        template_format="mustache",
-        input_variables=["content"]
-    )
-    
     # 测试包含HTML标签的内容
-    prompt = prompt_template.format(
+    prompt = ESCAPE_PROMPT.format(
         content="<script>alert('test')</script>"  # 恶意脚本代码，用于测试转义效果
     )
     
@@ -268,27 +300,24 @@ HTML转义：{{&content}}      {{! 同样无转义：&符号是{{{}}}的简写
 
 
 
-def practical_naming_example():
-    """实用的起名示例"""
-    print("=== 实用起名示例 ===")
-    
-    template = """
+# 模板中的嵌套字段使用展开后的键（如 request_applicant），配合 flatten 使用，渲染时不需要逐层查找
+PRACTICAL_NAMING_PROMPT = CompiledMustache(escape=False, template="""
 {{#request}}
 起名请求详情：
 ================================================
-申请人：{{request.applicant}}
+申请人：{{request_applicant}}
 孩子信息：
-  - 姓名：{{request.child_name}}
-  - 性别：{{request.gender}}
-  - 出生时间：{{request.birth_date}}
-  - 姓氏：{{request.surname}}
-特殊要求：{{request.requirements}}
-{{#request.parent_names}}
-父母姓名：{{request.parent_names.father}} & {{request.parent_names.mother}}
-{{/request.parent_names}}
-{{^request.parent_names}}
+  - 姓名：{{request_child_name}}
+  - 性别：{{request_gender}}
+  - 出生时间：{{request_birth_date}}
+  - 姓氏：{{request_surname}}
+特殊要求：{{request_requirements}}
+{{#request_parent_names}}
+父母姓名：{{request_parent_names_father}} & {{request_parent_names_mother}}
+{{/request_parent_names}}
+{{^request_parent_names}}
 父母姓名：未提供
-{{/request.parent_names}}
+{{/request_parent_names}}
 ================================================
 
 {{#expert}}
@@ -302,13 +331,12 @@ def practical_naming_example():
 {{/names}}
 {{/expert}}
 {{/request}}
-"""
-    
-    prompt_template = PromptTemplate(
-        template=template,
-        template_format="mustache",
-        input_variables=["request", "expert"]
-    )
+""")
+
+
+def practical_naming_example():
+    """实用的起名示例"""
+    print("=== 实用起名示例 ===")
     
     # 构造数据
     request_data = {
@@ -350,10 +378,10 @@ def practical_naming_example():
         ]
     }
     
-    prompt = prompt_template.format(
-        request=request_data,
-        expert=expert_data
-    )
+    prompt = PRACTICAL_NAMING_PROMPT.format(**flatten({
+        "request": request_data,
+        "expert": expert_data
+    }))
     
     print(prompt)
 
@@ -3,37 +3,53 @@ LangChain Tools 高级Schema定义示例
 展示如何定义具有复杂参数类型的工具，包括Pydantic模型和详细的参数验证
 """
 
-import os
+import asyncio
+import math
+import statistics
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+
+import orjson
 from langchain.tools import tool
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel, Field
 from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from common import PROJECT_ROOT
+from common.env import load_env
+from common.llm import init_model
+
+# 加载配置，密钥与访问地址在创建模型时显式传入，不再写入 OPENAI_* 环境变量
+config_path = PROJECT_ROOT / 'config-zhipu.env'
+env = load_env(config_path)
+model_name = env["model"]
 
-# 加载环境变量
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config-zhipu.env')
-load_dotenv(config_path)
 
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model_name = os.getenv('MODEL')
+@lru_cache(maxsize=64)
+def schema_json(schema_cls):
+    """按 Schema 类缓存生成的 JSON Schema，同一个类只需要遍历生成一次"""
+    return schema_cls.model_json_schema()
 
 
 def pretty_print_schema_info(tool_obj):
-    """美化的Schema信息输出"""
+    """美化的Schema信息输出，Schema 通过 orjson 序列化，整块内容一次写出"""
     separator = "=" * 60
-    print(f"\n{separator}")
-    print(f"🔧 工具名称: {tool_obj.name}")
-    print(f"📝 工具描述: {tool_obj.description}")
-    print(f"📋 工具Schema:")
+    lines = [
+        f"\n{separator}",
+        f"🔧 工具名称: {tool_obj.name}",
+        f"📝 工具描述: {tool_obj.description}",
+        "📋 工具Schema:",
+    ]
     if hasattr(tool_obj, 'args_schema'):
-        print(f"   Schema: {tool_obj.args_schema.model_json_schema()}")
+        lines.append("   Schema: " + orjson.dumps(schema_json(tool_obj.args_schema), option=orjson.OPT_INDENT_2).decode())
     elif hasattr(tool_obj, 'args'):
-        print(f"   Args: {tool_obj.args}")
-    print(separator)
+        lines.append(f"   Args: {tool_obj.args}")
+    lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 class UserSearchInput(BaseModel):
@@ -51,6 +67,39 @@ class DatabaseQueryInput(BaseModel):
     limit: Optional[int] = Field(default=100, description="查询结果数量限制")
 
 
+# 模拟数据库的行记录：slots 数据类没有每个实例的 __dict__，内存占用更小，字段通过 slot 直接访问
+@dataclass(slots=True, frozen=True)
+class User:
+    id: int
+    name: str
+    department: str
+    active: bool
+
+
+@dataclass(slots=True, frozen=True)
+class Employee:
+    id: int
+    name: str
+    department: str
+    salary: int
+
+
+@dataclass(slots=True, frozen=True)
+class Department:
+    id: int
+    name: str
+    head: str
+
+
+# 模拟用户数据库，按用户名索引
+MOCK_USERS = {user.name: user for user in [
+    User(1, "张三", "技术部", True),
+    User(2, "李四", "销售部", False),
+    User(3, "王五", "技术部", True),
+    User(4, "赵六", "人事部", True),
+]}
+
+
 @tool(args_schema=UserSearchInput)
 def search_user(username: str, department: Optional[str] = None, active_only: bool = True) -> Dict[str, Any]:
     """
@@ -66,26 +115,70 @@ def search_user(username: str, department: Optional[str] = None, active_only: bo
     """
     print(f"搜索用户: {username}, 部门: {department}, 仅活跃用户: {active_only}")
     
-    # 模拟用户数据库
-    mock_users = {
-        "张三": {"id": 1, "name": "张三", "department": "技术部", "active": True},
-        "李四": {"id": 2, "name": "李四", "department": "销售部", "active": False},
-        "王五": {"id": 3, "name": "王五", "department": "技术部", "active": True},
-        "赵六": {"id": 4, "name": "赵六", "department": "人事部", "active": True},
-    }
-    
-    user = mock_users.get(username)
+    user = MOCK_USERS.get(username)
     if user:
         # 应用过滤条件
-        if department and user["department"] != department:
+        if department and user.department != department:
             return {"error": f"用户 {username} 不在 {department} 部门"}
-        if active_only and not user["active"]:
+        if active_only and not user.active:
             return {"error": f"用户 {username} 不活跃"}
-        return {"user_found": True, "user_info": user}
+        return {"user_found": True, "user_info": asdict(user)}
     else:
         return {"user_found": False, "message": f"未找到用户 {username}"}
 
 
+# 模拟数据库
+MOCK_TABLES = {
+    "employees": [
+        Employee(1, "张三", "技术部", 15000),
+        Employee(2, "李四", "销售部", 12000),
+        Employee(3, "王五", "技术部", 18000),
+    ],
+    "departments": [
+        Department(1, "技术部", "张主任"),
+        Department(2, "销售部", "李主任"),
+        Department(3, "人事部", "王主任"),
+    ]
+}
+
+
+def build_table_indexes(tables):
+    """
+    为每张表的每一列构建 值 -> 行号集合 的索引，查询时按条件直接定位匹配的行
+    :param tables: 表名到行数据列表的映射
+    :return: {表名: {列名: {值: 行号集合}}}
+    """
+    indexes = {}
+    for table_name, rows in tables.items():
+        table_index = indexes[table_name] = defaultdict(lambda: defaultdict(set))
+        for row_id, row in enumerate(rows):
+            for field in fields(row):
+                table_index[field.name][getattr(row, field.name)].add(row_id)
+    return indexes
+
+
+# 索引在模块加载时构建一次
+TABLE_INDEXES = build_table_indexes(MOCK_TABLES)
+
+# 按列存储的表数据：{表名: {列名: 该列所有行的值}}，列筛选时只访问需要的列
+TABLE_COLUMNS = {
+    table_name: {field.name: tuple(getattr(row, field.name) for row in rows) for field in fields(rows[0])}
+    for table_name, rows in MOCK_TABLES.items() if rows
+}
+
+
+def matching_rows(table_index, key, value):
+    """
+    从索引中取出某个条件匹配的行号
+    模型生成的条件值可能是字典、列表等不可哈希的值（如 {"$gt": 12000}），这类值不会等于任何单元格的值，直接返回空集合
+    """
+    try:
+        return table_index.get(key, {}).get(value, set())
+    except TypeError:
+        # unhashable type
+        return set()
+
+
 @tool(args_schema=DatabaseQueryInput)
 def query_database(table_name: str, columns: List[str], conditions: Dict[str, Any], limit: Optional[int] = 100) -> Dict[str, Any]:
     """
@@ -105,40 +198,21 @@ def query_database(table_name: str, columns: List[str], conditions: Dict[str, An
     print(f"条件: {conditions}")
     print(f"限制: {limit}")
     
-    # 模拟数据库查询
-    mock_data = {
-        "employees": [
-            {"id": 1, "name": "张三", "department": "技术部", "salary": 15000},
-            {"id": 2, "name": "李四", "department": "销售部", "salary": 12000},
-            {"id": 3, "name": "王五", "department": "技术部", "salary": 18000},
-        ],
-        "departments": [
-            {"id": 1, "name": "技术部", "head": "张主任"},
-            {"id": 2, "name": "销售部", "head": "李主任"},
-            {"id": 3, "name": "人事部", "head": "王主任"},
-        ]
-    }
-    
-    table_data = mock_data.get(table_name, [])
-    
-    # 应用筛选条件
-    filtered_data = []
-    for row in table_data:
-        match = True
-        for key, value in conditions.items():
-            if key not in row or row[key] != value:
-                match = False
-                break
-        if match:
-            filtered_data.append(row)
-    
-    # 应用列筛选
-    if columns:
-        filtered_data = [{k: v for k, v in row.items() if k in columns} for row in filtered_data]
+    # 应用筛选条件：每个条件从索引中取出匹配的行号，多个条件取交集，不再逐行逐条件比较
+    if conditions:
+        table_index = TABLE_INDEXES.get(table_name, {})
+        row_ids = sorted(set.intersection(*(matching_rows(table_index, key, value) for key, value in conditions.items())))
+    else:
+        row_ids = range(len(MOCK_TABLES.get(table_name, [])))
     
-    # 应用数量限制
+    # 应用数量限制：先截取行号，只组装需要返回的行
     if limit:
-        filtered_data = filtered_data[:limit]
+        row_ids = row_ids[:limit]
+    
+    # 应用列筛选：按列存储的数据直接按行号取值
+    table_columns = TABLE_COLUMNS.get(table_name, {})
+    selected_columns = [column for column in (columns or table_columns) if column in table_columns]
+    filtered_data = [{column: table_columns[column][row_id] for column in selected_columns} for row_id in row_ids]
     
     return {
         "table": table_name,
@@ -147,22 +221,24 @@ def query_database(table_name: str, columns: List[str], conditions: Dict[str, An
     }
 
 
+# 高级计算器支持的操作，每种操作都是对列表的一次 C 实现的遍历
+CALCULATOR_OPERATIONS = {
+    "sum": math.fsum,
+    "average": statistics.fmean,
+    "max": max,
+    "min": min,
+}
+
+
 def create_structured_tool_manually():
     """手动创建带Schema的工具"""
     def advanced_calculator(numbers: List[float], operation: str) -> Dict[str, Any]:
         """高级计算器，支持对数字列表执行操作"""
         print(f"对数字列表 {numbers} 执行 {operation} 操作")
         
-        if operation == "sum":
-            result = sum(numbers)
-        elif operation == "average":
-            result = sum(numbers) / len(numbers) if numbers else 0
-        elif operation == "max":
-            result = max(numbers) if numbers else 0
-        elif operation == "min":
-            result = min(numbers) if numbers else 0
-        else:
+        if operation not in CALCULATOR_OPERATIONS:
             raise ValueError(f"不支持的操作: {operation}")
+        result = CALCULATOR_OPERATIONS[operation](numbers) if numbers else 0
         
         return {
             "operation": operation,
@@ -189,95 +265,99 @@ def create_structured_tool_manually():
     return structured_tool
 
 
-def advanced_schema_demo():
+# 手动创建的结构化工具
+MANUAL_TOOL = create_structured_tool_manually()
+
+# 工具按名称索引，执行模型返回的工具调用时直接查找
+TOOL_MAP = {t.name: t for t in [search_user, query_database]}
+ALL_TOOL_MAP = {**TOOL_MAP, MANUAL_TOOL.name: MANUAL_TOOL}
+
+# 工具转换后的 OpenAI 工具描述在模块加载时生成一次，绑定到模型时直接复用，不需要每次 bind_tools 都重新遍历 Schema
+TOOL_SPECS = [convert_to_openai_tool(t) for t in TOOL_MAP.values()]
+ALL_TOOL_SPECS = [*TOOL_SPECS, convert_to_openai_tool(MANUAL_TOOL)]
+
+
+async def execute_tool_calls(tool_calls, tool_map):
+    """
+    并发执行模型在一次响应中返回的多个工具调用，总耗时取决于最慢的一个工具
+    :param tool_calls: 模型返回的工具调用列表
+    :param tool_map: 工具名称到工具的映射，不在其中的工具调用会被忽略
+    :return:
+    """
+    results = await asyncio.gather(*(tool_map[tool_call['name']].ainvoke(tool_call['args'])
+                                     for tool_call in tool_calls if tool_call['name'] in tool_map))
+    for result in results:
+        print(f"   工具调用结果: {result}")
+
+
+async def advanced_schema_demo():
     """高级Schema工具演示"""
     print("🚀 开始 LangChain Tools 高级Schema示例演示")
 
-    model = init_chat_model(model=model_name,
-                           model_provider="openai",
-                           temperature=0.7,
-                           timeout=30,
-                           max_tokens=1000,
-                           max_retries=3)
-    
-    # 1. 使用Pydantic Schema的用户搜索工具
-    print("\n1️⃣ 用户搜索工具 (带Schema):")
-    pretty_print_schema_info(search_user)
+    model = init_model(model_name, api_key=env["api_key"], base_url=env["base_url"])
     
     # 使用模型触发工具调用（模拟工具回调）
-    tools = [search_user, query_database]
-    model_with_tools = model.bind_tools(tools)
+    model_with_tools = model.bind(tools=TOOL_SPECS, tool_choice="auto")
+    # 将手动创建的工具也加入工具列表
+    model_with_all_tools = model.bind(tools=ALL_TOOL_SPECS, tool_choice="auto")
     
     user_request = "请帮我查找技术部的张三用户信息，只返回活跃用户"
-    print(f"   用户请求: {user_request}")
+    db_request = "查询员工表中技术部员工的姓名和薪资信息，限制10条"
+    calc_request = "计算数字列表 [10, 20, 30, 40] 的平均值"
+    validation_request = "请帮我查找空用户名的用户信息"
     
-    response = model_with_tools.invoke([HumanMessage(content=user_request)])
+    # 四个请求相互独立，通过 asyncio.gather 并发发起，总耗时取决于最慢的一次调用；结果返回后再依次展示
+    response, response2, response3, response4 = await asyncio.gather(
+        model_with_tools.ainvoke([HumanMessage(content=user_request)]),
+        model_with_tools.ainvoke([HumanMessage(content=db_request)]),
+        model_with_all_tools.ainvoke([HumanMessage(content=calc_request)]),
+        model_with_tools.ainvoke([HumanMessage(content=validation_request)]),
+    )
+    
+    # 1. 使用Pydantic Schema的用户搜索工具
+    print("\n1️⃣ 用户搜索工具 (带Schema):")
+    pretty_print_schema_info(search_user)
+    print(f"   用户请求: {user_request}")
     
     if response.tool_calls:
         print(f"   模型决定调用工具: {response.tool_calls[0]['name']}")
         print(f"   工具参数: {response.tool_calls[0]['args']}")
         
         # 执行工具调用（这才是真正的工具回调）
-        for tool_call in response.tool_calls:
-            if tool_call['name'] == search_user.name:
-                result = search_user.invoke(tool_call['args'])
-                print(f"   工具调用结果: {result}")
+        await execute_tool_calls(response.tool_calls, TOOL_MAP)
     else:
         print("   模型决定不需要调用工具")
     
     # 2. 使用Pydantic Schema的数据库查询工具
     print("\n2️⃣ 数据库查询工具 (带Schema):")
     pretty_print_schema_info(query_database)
-    
-    # 使用模型触发工具调用
-    db_request = "查询员工表中技术部员工的姓名和薪资信息，限制10条"
     print(f"   用户请求: {db_request}")
     
-    response2 = model_with_tools.invoke([HumanMessage(content=db_request)])
-    
     if response2.tool_calls:
         print(f"   模型决定调用工具: {response2.tool_calls[0]['name']}")
         print(f"   工具参数: {response2.tool_calls[0]['args']}")
         
         # 执行工具调用
-        for tool_call in response2.tool_calls:
-            if tool_call['name'] == query_database.name:
-                result = query_database.invoke(tool_call['args'])
-                print(f"   工具调用结果: {result}")
+        await execute_tool_calls(response2.tool_calls, TOOL_MAP)
     else:
         print("   模型决定不需要调用工具")
     
     # 3. 手动创建的结构化工具
     print("\n3️⃣ 手动创建的高级计算器工具:")
-    manual_tool = create_structured_tool_manually()
-    pretty_print_schema_info(manual_tool)
-    
-    # 将手动创建的工具也加入工具列表
-    all_tools = [search_user, query_database, manual_tool]
-    model_with_all_tools = model.bind_tools(all_tools)
-    
-    calc_request = "计算数字列表 [10, 20, 30, 40] 的平均值"
+    pretty_print_schema_info(MANUAL_TOOL)
     print(f"   用户请求: {calc_request}")
     
-    response3 = model_with_all_tools.invoke([HumanMessage(content=calc_request)])
-    
     if response3.tool_calls:
         print(f"   模型决定调用工具: {response3.tool_calls[0]['name']}")
         print(f"   工具参数: {response3.tool_calls[0]['args']}")
         
         # 执行工具调用
-        for tool_call in response3.tool_calls:
-            if tool_call['name'] == manual_tool.name:
-                result = manual_tool.invoke(tool_call['args'])
-                print(f"   工具调用结果: {result}")
+        await execute_tool_calls(response3.tool_calls, ALL_TOOL_MAP)
     else:
         print("   模型决定不需要调用工具")
     
     # 4. Schema验证示例
     print("\n4️⃣ Schema验证示例:")
-    validation_request = "请帮我查找空用户名的用户信息"
-    
-    response4 = model_with_tools.invoke([HumanMessage(content=validation_request)])
     
     if response4.tool_calls:
         print(f"   模型决定调用工具: {response4.tool_calls[0]['name']}")
@@ -285,10 +365,7 @@ def advanced_schema_demo():
         
         # 尝试执行工具调用，可能会因验证失败而抛出异常
         try:
-            for tool_call in response4.tool_calls:
-                if tool_call['name'] == search_user.name:
-                    result = search_user.invoke(tool_call['args'])
-                    print(f"   工具调用结果: {result}")
+            await execute_tool_calls(response4.tool_calls, {search_user.name: search_user})
         except Exception as e:
             print(f"   ✅ 正确捕获验证错误: {e}")
     else:
@@ -296,4 +373,4 @@ def advanced_schema_demo():
 
 
 if __name__ == "__main__":
-    advanced_schema_demo()
\ No newline at end of file
+    asyncio.run(advanced_schema_demo())
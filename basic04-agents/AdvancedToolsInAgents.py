@@ -3,116 +3,56 @@ LangChain Agents 工具进阶使用示例
 展示工具定义与基础使用，高阶使用（如异常处理策略、ReAct实现、Dynamic tools等）
 """
 
+import asyncio
 import logging
-import os
 
-from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.agents.middleware import wrap_tool_call
-from langchain.chat_models import init_chat_model
-from langchain.tools import tool
 from langchain_core.messages import HumanMessage, ToolMessage
 
+from common.agent import find_duplicate_tool_result, stream_agent
+from common.config import MODEL
+from common.llm import init_model, with_api_retry
+from common.pretty import format_message
+from common.tools import calculator, weather_checker
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 加载环境变量
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.env')
-load_dotenv(config_path)
-
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model_name = os.getenv('MODEL')
-
-
-def init_model(model=model_name):
-    """初始化 LLM Model"""
-    return init_chat_model(
-        model=model,
-        model_provider="openai",
-        temperature=0.7,
-        timeout=30,
-        max_tokens=1500,
-        max_retries=3,
-    )
-
-
-# 定义一些基础工具
-@tool
-def calculator(num1: float, operation: str, num2: float) -> float:
-    """
-    执行基本数学运算的计算器工具
-
-    Args:
-        num1: 第一个数字
-        operation: 运算符 (+, -, *, /)
-        num2: 第二个数字
-
-    Returns:
-        float: 计算结果
-    """
-    print(f"🧮 执行计算: {num1} {operation} {num2}")
-
-    if operation == "+":
-        return num1 + num2
-    elif operation == "-":
-        return num1 - num2
-    elif operation == "*":
-        return num1 * num2
-    elif operation == "/":
-        if num2 == 0:
-            raise ValueError("除数不能为零")
-        return num1 / num2
-    else:
-        raise ValueError(f"不支持的运算符: {operation}")
-
-
-@tool
-def weather_checker(city: str) -> str:
-    """
-    查询城市天气信息的工具
-
-    Args:
-        city: 城市名称
-
-    Returns:
-        str: 天气信息
-    """
-    print(f"🌤️ 查询 {city} 的天气")
-    # 模拟天气数据
-    weather_data = {
-        "北京": "晴天，温度 15°C",
-        "上海": "多云，温度 18°C",
-        "广州": "雨天，温度 22°C",
-        "深圳": "阴天，温度 20°C",
-        "杭州": "晴天，温度 16°C"
-    }
-    return weather_data.get(city, f"暂无 {city} 的天气信息")
+# 模型名称，config.env 由 common.config 统一加载
+model_name = MODEL
 
 
 # 要自定义工具错误的处理方式，请使用 @wrap_tool_call 装饰器创建中间件
+# 示例中的 agent 都通过异步接口调用，中间件需要定义为 async 函数，handler 的返回同样需要 await
 @wrap_tool_call
-def handle_tool_errors(request, handler):
+async def handle_tool_errors(request, handler):
     """Handle tool execution errors with custom messages."""
+    # 本次调用中已经执行过相同的工具调用时，直接复用之前的结果
+    duplicate = find_duplicate_tool_result(request)
+    if duplicate is not None:
+        return duplicate
     try:
-        return handler(request)
+        return await handler(request)
     except Exception as e:
         # Return a custom error message to the model
         return ToolMessage(
             content=f"Tool error: Please check your input and try again. ({str(e)})",
-            tool_call_id=request.tool_call["id"]
+            tool_call_id=request.tool_call["id"],
+            status="error",  # 标记为失败，相同的调用不会复用这次的结果
         )
 
 
-def basic_agent_demo():
+async def basic_agent_demo():
     """基础Agent使用演示"""
     print("🚀 开始 LangChain Agents 基础示例演示")
 
     # 创建Agent
     # 初始化模型
-    llm = init_model()
+    # common.llm.init_model 按模型名与参数缓存实例，各示例函数共用同一个模型及其连接池，不再重复创建客户端
+    # 重试由外层的 with_api_retry 负责，客户端内部不再重试
+    llm = init_model(model_name, max_tokens=1500, max_retries=0)
 
     # 定义工具列表
     tools = [calculator, weather_checker]
@@ -135,37 +75,37 @@ def basic_agent_demo():
 
     print(f"\n🎯 开始测试 {len(test_queries)} 个问题:")
 
-    for i, query in enumerate(test_queries, 1):
+    # 调用Agent，传入的是一个输入字典, 其中 messages 是一个消息列表, 除了使用字典方式表示消息之外，还可以通过 HumanMessage 的方式传入
+    batched_inputs = [{"messages": [{"role": "user", "content": query}]} for query in test_queries]
+    # 各个问题之间相互独立，通过 asyncio.gather 并发发起请求，总耗时接近最慢的一次调用，而不是所有调用之和
+    # 每个问题单独 ainvoke 并各自重试：带重试的 abatch 遇到不可重试的异常时会让整批结果都变成该异常，
+    # 逐个调用配合 return_exceptions，单个问题失败不影响其他问题的结果与重试
+    retrying_agent = with_api_retry(agent)
+    responses = await asyncio.gather(*[retrying_agent.ainvoke(inputs) for inputs in batched_inputs],
+                                     return_exceptions=True)
+
+    for i, (query, response) in enumerate(zip(test_queries, responses), 1):
         print(f"\n{'=' * 20} 测试 {i}/{len(test_queries)} {'=' * 20}")
         print(f"❓ 问题: {query}")
 
-        try:
-            # 调用Agent，传入的是一个输入字典, 其中 messages 是一个消息列表, 除了使用字典方式表示消息之外，还可以通过 HumanMessage 的方式传入
-            inputs = {"messages": [{"role": "user", "content": query}]}
-            # 同步调用，直接获取返回结果
-            response = agent.invoke(inputs)
-
-            # 显示完整对话历史，对于agent，调用工具时，不需要像model一样，由我们来维护工具的执行；工具的完整执行链路都是由Agent来驱动的
-            print("💬 对话历史:")
-            for msg in response["messages"]:
-                if hasattr(msg, 'content'):
-                    print(f"   {msg.type}: {msg.content}")
-                elif isinstance(msg, dict):
-                    print(f"   {msg.get('role', 'unknown')}: {msg.get('content', '')}")
-
-        except Exception as e:
-            print(f"❌ 执行出错: {e}")
+        if isinstance(response, Exception):
+            print(f"❌ 执行出错: {response}")
             continue
 
+        # 显示完整对话历史，对于agent，调用工具时，不需要像model一样，由我们来维护工具的执行；工具的完整执行链路都是由Agent来驱动的
+        print("💬 对话历史:")
+        for msg in response["messages"]:
+            print(format_message(msg))
+
 
-def react_loop():
+async def react_loop():
     """
     智能体遵循 ReAct（“推理+行动”）模式，在简短的推理步骤和有针对性的工具调用之间交替进行，并将由此产生的观察结果反馈到后续决策中，直到能够给出最终答案。
     :return:
     """
     print("\n🎯 Stream访问演示:")
 
-    llm = init_model()
+    llm = init_model(model_name, max_tokens=1500)
     tools = [calculator, weather_checker]
 
     agent = create_agent(llm, tools, system_prompt="""你是一个专业的智能助手，具有以下能力：
@@ -185,28 +125,27 @@ def react_loop():
             inputs = {"messages": [HumanMessage(query)]}
             # 显示完整对话历史
             print("💬 对话历史:")
-            # 流式调用：该模式会在智能体的每个执行步骤完成后传输中间数据，让开发者能够观察到完整的决策过程，如上例所示，值流模式会分四次更新数据：HumanMessage（用户输入）、AIMessage（模型初始响应）、ToolMessage（工具调用结果）和最终的AIMessage（总结回答）
-            last_type = None
-            for step in agent.stream(inputs, stream_mode="values"):
-                msg = step['messages'][-1]
-                if last_type != msg.type:
-                    print(f"\n   {msg.type}: ", end='')
-                    last_type = msg.type
-                print(msg.content, end='', flush=True)
+            # 流式调用：逐个 token 输出模型回复，以及工具调用的结果
+            await stream_agent(agent, inputs)
 
             print("\n\n")
         except Exception as e:
             print(f"❌ 执行出错: {e}")
 
 
-if __name__ == "__main__":
+async def main():
     print("🔧 LangChain Agents 工具进阶使用示例")
     print("=" * 60)
 
     # 高级工具演示
-    basic_agent_demo()
+    await basic_agent_demo()
 
     # 错误处理演示
-    react_loop()
+    await react_loop()
 
     print("\n✅ 工具进阶示例演示完成！")
+
+
+if __name__ == "__main__":
+    # 所有示例在同一个事件循环中执行
+    asyncio.run(main())
@@ -2,117 +2,34 @@
 LangChain Agents 动态工具进阶使用示例
 """
 
+import asyncio
 import logging
-import os
 from dataclasses import dataclass
-from typing import Callable
+from typing import Awaitable, Callable
 
-from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.agents.middleware import wrap_model_call, ModelRequest, ModelResponse, AgentMiddleware
-from langchain.chat_models import init_chat_model
-from langchain.tools import tool
 from langchain_core.messages import HumanMessage
 from langgraph.prebuilt.tool_node import ToolCallRequest
 
+from common import PROJECT_ROOT
+from common.agent import find_duplicate_tool_result, stream_agent
+from common.cache import enable_llm_cache
+from common.env import load_env
+from common.llm import init_model, with_api_retry
+from common.tools import calculator, weather_checker, web_search
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 加载环境变量
-config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config-zhipu.env')
-load_dotenv(config_path)
-
-# 初始化环境变量
-os.environ["OPENAI_API_KEY"] = os.getenv('API_KEY')
-os.environ["OPENAI_BASE_URL"] = os.getenv('BASE_URL')
-model_name = os.getenv('MODEL')
-
-
-def init_model(model=model_name):
-    """初始化 LLM Model"""
-    return init_chat_model(
-        model=model,
-        model_provider="openai",
-        temperature=0.7,
-        timeout=30,
-        max_tokens=1500,
-        max_retries=3,
-    )
-
-
-# 定义一些基础工具
-@tool
-def calculator(num1: float, operation: str, num2: float) -> float:
-    """
-    执行基本数学运算的计算器工具
-
-    Args:
-        num1: 第一个数字
-        operation: 运算符 (+, -, *, /)
-        num2: 第二个数字
-
-    Returns:
-        float: 计算结果
-    """
-    print(f"🧮 执行计算: {num1} {operation} {num2}")
-
-    if operation == "+":
-        return num1 + num2
-    elif operation == "-":
-        return num1 - num2
-    elif operation == "*":
-        return num1 * num2
-    elif operation == "/":
-        if num2 == 0:
-            raise ValueError("除数不能为零")
-        return num1 / num2
-    else:
-        raise ValueError(f"不支持的运算符: {operation}")
-
-
-@tool
-def weather_checker(city: str) -> str:
-    """
-    查询城市天气信息的工具
-
-    Args:
-        city: 城市名称
-
-    Returns:
-        str: 天气信息
-    """
-    print(f"🌤️ 查询 {city} 的天气")
-    # 模拟天气数据
-    weather_data = {
-        "北京": "晴天，温度 15°C",
-        "上海": "多云，温度 18°C",
-        "广州": "雨天，温度 22°C",
-        "深圳": "阴天，温度 20°C",
-        "杭州": "晴天，温度 16°C"
-    }
-    return weather_data.get(city, f"暂无 {city} 的天气信息")
-
-
-@tool
-def web_search(query: str) -> str:
-    """
-    模拟网络搜索工具
-
-    Args:
-        query: 搜索关键词
+# 加载配置，密钥与访问地址在创建模型时显式传入，不再写入 OPENAI_* 环境变量
+config_path = PROJECT_ROOT / 'config-zhipu.env'
+env = load_env(config_path)
+model_name = env["model"]
 
-    Returns:
-        str: 搜索结果摘要
-    """
-    print(f"🔍 搜索: {query}")
-    # 模拟搜索结果
-    search_results = {
-        "人工智能发展": "人工智能是计算机科学的一个分支，致力于创建能够执行通常需要人类智能的任务的机器...",
-        "Python编程": "Python是一种高级编程语言，以其简洁易读的语法和强大的功能库而闻名...",
-        "机器学习": "机器学习是人工智能的一个子领域，使计算机能够在不被明确编程的情况下从数据中学习..."
-    }
-    return search_results.get(query, f"关于'{query}'的搜索结果显示：这是相关的知识内容...")
+# 本地 SQLite 缓存：示例反复运行时，相同的请求直接从磁盘返回，不再访问网络；需要在创建模型之前启用
+enable_llm_cache()
 
 
 @dataclass
@@ -120,36 +37,43 @@ class UserContext:
     user_role: str
 
 
-@wrap_model_call
-def filter_tools(
-        request: ModelRequest,
-        handler: Callable[[ModelRequest], ModelResponse],
-) -> ModelResponse:
-    """Filter tools based on user permissions."""
-    # 如果在创建代理时已知所有可能的工具，则可以预先注册它们，并根据状态、权限或上下文动态筛选哪些工具可以公开给模型。
-    user_role = request.runtime.context.user_role
-
-    if user_role == "math":
+def make_filter_tools(tools):
+    """
+    根据预先注册的工具列表，创建按用户角色筛选工具的中间件
+    注册的工具在 agent 创建后不会再变化，各角色可用的工具子集在这里只计算一次，每次模型调用只需一次字典查找
+    :param tools: 创建 agent 时注册的工具列表
+    :return:
+    """
+    role_tools = {
+        "math": [t for t in tools if t.name == "calculator"],
+        "search": [t for t in tools if t.name == "web_search"],
         # Admins get all tools
-        tools = [t for t in request.tools if t.name == "calculator"]
-    elif user_role == 'search':
-        tools = [t for t in request.tools if t.name == "web_search"]
-    elif user_role == 'admin':
-        tools = request.tools
-    else:
-        # Regular users get read-only tools
-        tools = []
+        "admin": list(tools),
+    }
+
+    # 示例中的 agent 都通过异步接口调用，中间件需要定义为 async 函数，handler 的返回同样需要 await
+    @wrap_model_call
+    async def filter_tools(
+            request: ModelRequest,
+            handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        """Filter tools based on user permissions."""
+        # 如果在创建代理时已知所有可能的工具，则可以预先注册它们，并根据状态、权限或上下文动态筛选哪些工具可以公开给模型。
+        # Regular users get no tools
+        return await handler(request.override(tools=role_tools.get(request.runtime.context.user_role, [])))
 
-    return handler(request.override(tools=tools))
+    return filter_tools
 
 
-def filter_pre_registered_tools():
+async def filter_pre_registered_tools():
     # 如果在创建代理时已知所有可能的工具，则可以预先注册它们，并根据状态、权限或上下文动态筛选哪些工具可以公开给模型。
     print("🚀 开始 LangChain Agents Tools示例演示")
 
     # 创建Agent
     # 初始化模型
-    llm = init_model()
+    # common.llm.init_model 按模型名与参数缓存实例，各示例函数共用同一个模型及其连接池，不再重复创建客户端
+    # 重试由外层的 with_api_retry 负责，客户端内部不再重试
+    llm = init_model(model_name, max_tokens=1500, api_key=env["api_key"], base_url=env["base_url"], max_retries=0)
 
     # 预先注册所有的工具列表
     tools = [calculator, weather_checker, web_search]
@@ -159,52 +83,69 @@ def filter_pre_registered_tools():
         model=llm,
         tools=tools,
         system_prompt="你是一个智能助手，可以根据用户的问题选择合适的工具来帮助解决问题。",
-        middleware=[filter_tools]
+        middleware=[make_filter_tools(tools)]
     )
 
-    # math 角色的用户，用于调用数据计算
-    response = agent.invoke({"messages": [{"role": "user", "content": "计算 25 乘以 4 等于多少？"}]},
-                            context=UserContext(user_role="math"))
-    for msg in response["messages"]:
-        print(f"{msg.type}: {msg.content}")
-
-    # search 角色的用户，用于访问math的工具，预期是无法正常调用工具
-    response = agent.invoke({"messages": [{"role": "user", "content": "计算 4 乘以 4 等于多少？"}]},
-                            context=UserContext(user_role="search"))
-    for msg in response["messages"]:
-        print(f"{msg.type}: {msg.content}")
-
-    # 给一个guest角色，预期是无法正常调用工具
-    response = agent.invoke({"messages": [{"role": "user", "content": "今天北京的天气怎么样？"}]},
-                            context=UserContext(user_role="guest"))
-    for msg in response["messages"]:
-        print(f"{msg.type}: {msg.content}")
+    cases = [
+        # math 角色的用户，用于调用数据计算
+        ("math", "计算 25 乘以 4 等于多少？"),
+        # search 角色的用户，用于访问math的工具，预期是无法正常调用工具
+        ("search", "计算 4 乘以 4 等于多少？"),
+        # 给一个guest角色，预期是无法正常调用工具
+        ("guest", "今天北京的天气怎么样？"),
+    ]
+
+    # 三个请求相互独立，并发发起；agent.abatch 的额外参数会被所有输入共用，无法为每个请求传入不同的 context，
+    # 因此这里逐个创建 ainvoke 协程，通过 asyncio.gather 并发执行，结果按输入顺序返回
+    retrying_agent = with_api_retry(agent)
+    responses = await asyncio.gather(*[
+        retrying_agent.ainvoke({"messages": [{"role": "user", "content": query}]},
+                               context=UserContext(user_role=user_role))
+        for user_role, query in cases
+    ])
+
+    for response in responses:
+        for msg in response["messages"]:
+            print(f"{msg.type}: {msg.content}")
 
 
 class DynamicToolMiddleware(AgentMiddleware):
     """Middleware that registers and handles dynamic tools."""
 
-    def wrap_model_call(self, request: ModelRequest, handler):
+    def __init__(self):
+        super().__init__()
+        # (静态工具列表, 追加动态工具后的列表)：agent 每次调用模型传入的是同一个静态工具列表，追加后的列表只需构建一次
+        self._tools_cache = None
+
+    # agent 通过异步接口调用时走的是 awrap_* 钩子
+    async def awrap_model_call(self, request: ModelRequest, handler):
         # Add dynamic tool to the request
         # This could be loaded from an MCP server, database, etc.
-        updated = request.override(tools=[*request.tools, calculator])
-        return handler(updated)
-
-    def wrap_tool_call(self, request: ToolCallRequest, handler):
+        cached = self._tools_cache
+        if cached is None or cached[0] is not request.tools:
+            cached = self._tools_cache = (request.tools, [*request.tools, calculator])
+        updated = request.override(tools=cached[1])
+        return await handler(updated)
+
+    async def awrap_tool_call(self, request: ToolCallRequest, handler):
+        # 本次调用中已经执行过相同的工具调用时，直接复用之前的结果
+        duplicate = find_duplicate_tool_result(request)
+        if duplicate is not None:
+            return duplicate
         # Handle execution of the dynamic tool
         if request.tool_call["name"] == "calculator":
-            return handler(request.override(tool=calculator))
-        return handler(request)
+            return await handler(request.override(tool=calculator))
+        return await handler(request)
 
 
-def runtime_tool_registration():
+async def runtime_tool_registration():
     """
     当在运行时发现或创建工具时（例如，从 MCP 服务器加载、根据用户数据生成或从远程注册表中获取），您需要注册这些工具并动态处理它们的执行。
     :return:
     """
     print("🚀 运行时工具注册示例")
     # 初始化模型
-    llm = init_model()
+    llm = init_model(model_name, max_tokens=1500, api_key=env["api_key"], base_url=env["base_url"])
 
     agent = create_agent(
         model=llm,
@@ -218,28 +159,27 @@ def runtime_tool_registration():
         inputs = {"messages": [HumanMessage(query)]}
         # 显示完整对话历史
         print("💬 对话历史:")
-        # 流式调用：该模式会在智能体的每个执行步骤完成后传输中间数据，让开发者能够观察到完整的决策过程，如上例所示，值流模式会分四次更新数据：HumanMessage（用户输入）、AIMessage（模型初始响应）、ToolMessage（工具调用结果）和最终的AIMessage（总结回答）
-        last_type = None
-        for step in agent.stream(inputs, stream_mode="values"):
-            msg = step['messages'][-1]
-            if last_type != msg.type:
-                print(f"\n   {msg.type}: ", end='')
-                last_type = msg.type
-            print(msg.content, end='', flush=True)
+        # 流式调用：逐个 token 输出模型回复，以及工具调用的结果
+        await stream_agent(agent, inputs)
 
         print("\n\n")
     except Exception as e:
         print(f"❌ 执行出错: {e}")
 
 
-if __name__ == "__main__":
+async def main():
     print("🔧 LangChain Agents 工具进阶使用示例")
     print("=" * 60)
 
     # 高级工具演示
-    filter_pre_registered_tools()
+    await filter_pre_registered_tools()
 
     # 错误处理演示
-    runtime_tool_registration()
+    await runtime_tool_registration()
 
     print("\n✅ 工具进阶示例演示完成！")
+
+
+if __name__ == "__main__":
+    # 所有示例在同一个事件循环中执行
+    asyncio.run(main())
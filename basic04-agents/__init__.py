@@ -3,48 +3,33 @@ LangChain Agents 模块
 包含完整的Agents学习示例和实用工具
 """
 
+# 共用工具，统一定义在 common.tools 中
+from common.tools import (
+    calculator,
+    weather_checker,
+    web_search
+)
+
 # 基础Agents功能
 from .BasicAgents import (
     init_model,
-    calculator,
-    weather_checker,
-    web_search,
-    create_basic_agent,
-    basic_agent_demo
+    basic_agent_demo,
+    stream_demo
 )
 
 # 高级工具功能
 from .AdvancedToolsInAgents import (
-    safe_calculator,
-    react_weather_checker,
-    DynamicToolFactory,
-    create_advanced_agent
+    handle_tool_errors,
+    react_loop
 )
 
-# 结构化输出功能
-from .StructuredOutputAgents import (
-    CalculationResult,
-    WeatherReport,
-    FinancialSummary,
-    AnalysisReport,
-    structured_calculator,
-    weather_analyzer
-)
-
-# 记忆功能
-from .MemoryAgents import (
-    EnhancedConversationMemory,
-    MemoryAwareAgent,
-    personalized_greeting,
-    preference_based_recommendation
-)
-
-# 流式功能
-from .StreamingAgents import (
-    StreamingCallbackHandler,
-    StreamingAgent,
-    async_calculator,
-    async_weather_checker
+# 动态工具功能
+from .DynamicToolsInAgents import (
+    UserContext,
+    make_filter_tools,
+    DynamicToolMiddleware,
+    filter_pre_registered_tools,
+    runtime_tool_registration
 )
 
 __all__ = [
@@ -52,30 +37,22 @@ __all__ = [
     'init_model',
     'calculator',
     'weather_checker',
+    'web_search',
     'basic_agent_demo',
-    
-
-    # 结构化输出
-    'CalculationResult',
-    'WeatherReport',
-    'FinancialSummary',
-    'AnalysisReport',
-    'structured_calculator',
-    'weather_analyzer',
-    
-    # 记忆功能
-    'EnhancedConversationMemory',
-    'MemoryAwareAgent',
-    'personalized_greeting',
-    'preference_based_recommendation',
-    
-    # 流式功能
-    'StreamingCallbackHandler',
-    'StreamingAgent',
-    'async_calculator',
-    'async_weather_checker',
+    'stream_demo',
+
+    # 高级工具
+    'handle_tool_errors',
+    'react_loop',
+
+    # 动态工具
+    'UserContext',
+    'make_filter_tools',
+    'DynamicToolMiddleware',
+    'filter_pre_registered_tools',
+    'runtime_tool_registration',
 ]
 
 # 版本信息
 __version__ = "1.0.0"
-__author__ = "一灰灰"
\ No newline at end of file
+__author__ = "一灰灰"
@@ -0,0 +1,7 @@
+"""
+各示例共用的基础模块
+"""
+from pathlib import Path
+
+# 项目根目录，只在导入时计算一次，各示例基于它定位配置文件
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -0,0 +1,55 @@
+"""
+Agent 示例共用的辅助函数：工具调用中间件与流式输出
+"""
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+
+def find_duplicate_tool_result(request):
+    """
+    在本次 agent 调用已经产生的消息中，查找名称与参数完全相同、且执行成功的工具调用结果
+    agent 重新规划时可能再次发起相同的工具调用（如重复查询同一个城市的天气），命中时直接复用之前的结果，不再执行工具
+    结果只从当前调用的 state 中查找，每次 invoke 相互独立，不会在不同用户、不同请求之间共享
+    :param request: 工具调用请求
+    :return: 复用之前结果的 ToolMessage，未命中时返回 None
+    """
+    tool_call = request.tool_call
+    name, args, call_id = tool_call["name"], tool_call["args"], tool_call["id"]
+    messages = request.state["messages"]
+
+    previous_ids = {
+        tc["id"]
+        for msg in messages if isinstance(msg, AIMessage)
+        for tc in msg.tool_calls
+        if tc["id"] != call_id and tc["name"] == name and tc["args"] == args
+    }
+    if not previous_ids:
+        return None
+
+    for msg in messages:
+        if isinstance(msg, ToolMessage) and msg.tool_call_id in previous_ids and msg.status != "error":
+            return ToolMessage(content=msg.content, tool_call_id=call_id, name=name)
+    return None
+
+
+async def stream_agent(agent, inputs, **kwargs):
+    """
+    以 messages 模式流式调用 agent，并逐个 token 输出对话内容
+    messages 模式会在模型生成过程中逐个 token 地传输消息片段（AIMessageChunk），工具执行完成后再传输对应的 ToolMessage，
+    相比 values 模式要等每个执行步骤完成后才输出整条消息，用户可以更早看到回复内容；
+    agent 以 messages 模式流式调用时，会自动以流式方式请求模型，不需要额外为模型开启 streaming
+    :param agent: create_agent 创建的 agent
+    :param inputs: agent 的输入
+    :param kwargs: 透传给 astream 的其他参数，如 context
+    :return:
+    """
+    last_type = None
+    async for chunk, metadata in agent.astream(inputs, stream_mode="messages", **kwargs):
+        # 只携带工具调用参数的片段没有文本内容，跳过，避免输出空的标签行
+        if not chunk.text:
+            continue
+        # AIMessageChunk 的 type 是类名，统一显示为 ai，与完整消息的类型保持一致
+        msg_type = "ai" if isinstance(chunk, AIMessageChunk) else chunk.type
+        if last_type != msg_type:
+            print(f"\n   {msg_type}: ", end='')
+            last_type = msg_type
+        print(chunk.text, end='', flush=True)
@@ -0,0 +1,66 @@
+"""
+本地 SQLite 缓存
+开发调试时示例会被反复运行，相同的 提示词 + 模型参数 直接从本地磁盘返回结果，不再访问网络、消耗 token
+"""
+import sqlite3
+import threading
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.load import dumps, loads
+
+from common import PROJECT_ROOT
+
+CACHE_PATH = PROJECT_ROOT / '.lc_cache.db'
+
+
+class SQLiteCache(BaseCache):
+    """
+    基于标准库 sqlite3 的 LLM 缓存，以 提示词 + 模型参数 作为缓存键
+    结构化输出、工具调用等返回结果同样会被缓存
+    """
+
+    def __init__(self, database_path):
+        # 异步调用时缓存的读写会在线程池中执行，因此允许跨线程使用同一个连接，并通过锁串行化访问
+        self._conn = sqlite3.connect(str(database_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "prompt TEXT NOT NULL, llm TEXT NOT NULL, idx INTEGER NOT NULL, response TEXT, "
+                "PRIMARY KEY (prompt, llm, idx))"
+            )
+
+    def lookup(self, prompt, llm_string):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE prompt = ? AND llm = ? ORDER BY idx",
+                (prompt, llm_string),
+            ).fetchall()
+        if not rows:
+            return None
+        # 缓存中只有 langchain_core 自身的 Generation、消息等类型，显式限定可反序列化的范围
+        return [loads(response, allowed_objects="core") for response, in rows]
+
+    def update(self, prompt, llm_string, return_val):
+        rows = [(prompt, llm_string, idx, dumps(generation)) for idx, generation in enumerate(return_val)]
+        # 先删除同一缓存键下的旧结果，新结果条数更少时不会残留多余的旧记录
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache WHERE prompt = ? AND llm = ?", (prompt, llm_string))
+            self._conn.executemany("INSERT INTO llm_cache VALUES (?, ?, ?, ?)", rows)
+
+    def clear(self, **kwargs):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+
+def enable_llm_cache(database_path=CACHE_PATH):
+    """
+    启用全局的本地 SQLite 缓存，需要在第一次调用模型之前执行
+    已经设置过全局缓存时直接跳过，多个示例模块一起导入时也只会打开一次数据库连接
+    :param database_path: 缓存数据库文件路径
+    :return: 当前生效的全局缓存
+    """
+    if get_llm_cache() is None:
+        set_llm_cache(SQLiteCache(database_path))
+    return get_llm_cache()
@@ -0,0 +1,24 @@
+"""
+公共配置
+统一加载项目根目录下的 config.env，各示例通过 from common.config import MODEL 的方式使用
+python 对模块的导入有缓存，无论多少个示例引用，config.env 都只会被读取、解析一次
+"""
+import os
+
+from common import PROJECT_ROOT
+from common.cache import enable_llm_cache
+from common.env import load_env
+
+CONFIG_PATH = PROJECT_ROOT / 'config.env'
+_env = load_env(CONFIG_PATH)
+
+API_KEY = _env["api_key"]
+BASE_URL = _env["base_url"]
+MODEL = _env["model"]
+
+# 初始化环境变量，init_chat_model 创建 openai 模型时会从环境变量中读取密钥和访问地址
+os.environ["OPENAI_API_KEY"] = API_KEY
+os.environ["OPENAI_BASE_URL"] = BASE_URL
+
+# 本地 SQLite 缓存：示例反复运行时，相同的请求直接从磁盘返回，不再访问网络
+enable_llm_cache()
@@ -0,0 +1,25 @@
+"""
+配置文件加载
+各示例使用的配置文件（config.env、config-zhipu.env 等）统一通过 load_env 读取
+"""
+import os
+from functools import lru_cache
+
+from dotenv import dotenv_values
+
+
+@lru_cache(maxsize=4)
+def load_env(path):
+    """
+    读取配置文件中的访问密钥、访问地址与模型名称，按路径缓存，同一个配置文件在进程内只会被读取、解析一次
+    只读取配置文件本身，不会写入 os.environ，多个配置文件在同一个进程中加载时互不覆盖；
+    与 load_dotenv 一致，已经设置的同名环境变量（API_KEY、BASE_URL、MODEL）优先于配置文件中的值
+    :param path: 配置文件路径
+    :return: 包含 api_key、base_url、model 的字典
+    """
+    values = dotenv_values(path)
+    return {
+        "api_key": os.getenv('API_KEY') or values.get('API_KEY'),
+        "base_url": os.getenv('BASE_URL') or values.get('BASE_URL'),
+        "model": os.getenv('MODEL') or values.get('MODEL'),
+    }
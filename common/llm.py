@@ -0,0 +1,63 @@
+"""
+各示例共用的模型初始化
+所有示例都走 OpenAI 兼容接口，因此直接构造 ChatOpenAI，省去 init_chat_model 按厂商查找、动态导入与参数过滤的开销
+"""
+from functools import lru_cache
+
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+
+# 共享的 HTTP 连接池，所有模型实例复用同一组 keep-alive 连接，避免每次请求重新建立 TCP/TLS 连接
+# 开启 HTTP/2 后，批量、流式等并发请求可以在同一条连接上多路复用，省去额外连接的握手与慢启动（需要安装 httpx[http2]）
+# agent 的批量、并发示例会同时发起多个请求，连接池上限需要足够大，避免请求在等待空闲连接时被串行化
+http_limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+http_client = httpx.Client(http2=True, limits=http_limits)
+http_async_client = httpx.AsyncClient(http2=True, limits=http_limits)
+
+# 只有限流与超时值得重试，参数错误等客户端异常重试多少次结果都一样，直接抛出
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError)
+
+
+@lru_cache(maxsize=8)
+def init_model(model, max_tokens=1000, api_key=None, base_url=None, max_retries=3):
+    """
+    初始化 LLM Model，按模型名与参数缓存实例，重复调用时复用同一个客户端
+    :param model: 模型名称
+    :param max_tokens: 限制响应中的令牌总数，从而有效地控制输出的长度
+    :param api_key: 访问密钥，不传时从环境变量 OPENAI_API_KEY 中读取
+    :param base_url: 访问地址，不传时从环境变量 OPENAI_BASE_URL 中读取；
+                     使用其他配置文件（如 config-zhipu.env）的示例显式传入密钥和地址，缓存会按配置区分，不会拿到其他配置创建的实例
+    :param max_retries: 客户端内部的最大失败重试次数；外层已经通过 with_api_retry 重试时传 0，避免两层重试叠加
+    :return:
+    """
+    credentials = {}
+    if api_key:
+        credentials["api_key"] = api_key
+    if base_url:
+        credentials["base_url"] = base_url
+    return ChatOpenAI(model=model,
+                      temperature=0.7,  # 温度，控制返回更稳定还是更有创造力的结果
+                      timeout=30,  # 设置超时时间，单位秒
+                      max_tokens=max_tokens,
+                      max_retries=max_retries,  # 最大失败重试次数
+                      http_client=http_client,  # 复用共享的同步连接池
+                      http_async_client=http_async_client,  # 复用共享的异步连接池
+                      **credentials,
+                      )
+
+
+def with_api_retry(runnable):
+    """
+    为 agent 等 Runnable 加上重试：只在限流、超时时重试，指数退避并加入随机抖动，避免并发请求同时重试再次触发限流
+    注意：不要对返回值调用 abatch(return_exceptions=True)，遇到不可重试的异常时整批结果都会变成该异常；
+    多个输入需要并发时，逐个 ainvoke 后通过 asyncio.gather(..., return_exceptions=True) 汇总
+    :param runnable: 需要重试的 Runnable，如 create_agent 创建的 agent
+    :return:
+    """
+    return runnable.with_retry(
+        retry_if_exception_type=RETRYABLE_ERRORS,
+        wait_exponential_jitter=True,
+        exponential_jitter_params={"initial": 1, "max": 60},
+        stop_after_attempt=5,
+    )
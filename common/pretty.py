@@ -0,0 +1,93 @@
+"""
+大模型返回结果的美化输出
+各示例共用的输出函数，每个输出块先拼接成完整的字符串，再通过一次 sys.stdout.write 写出，
+避免逐行 print 带来的多次加锁、格式化与写入
+"""
+import sys
+
+import orjson
+
+SEPARATOR = "=" * 60
+# 标题块只与回复类型有关，模块加载时拼接好，输出时不再重复格式化
+SYNC_HEADER = f"\n{SEPARATOR}\n🤖 AI 智能回复\n{SEPARATOR}\n"
+STREAM_HEADER = f"\n{SEPARATOR}\n🤖 AI 流式回复中...\n{SEPARATOR}\n"
+
+# getattr 的默认值哨兵，用于区分 属性不存在 与 属性值为 None
+MISSING = object()
+
+# 按类型缓存公开属性数量：同一类型的响应对象属性一致，dir() 扫描只需要执行一次
+public_attr_counts = {}
+
+
+def public_attr_count(response):
+    response_type = type(response)
+    if response_type not in public_attr_counts:
+        # 切片比较不需要逐个属性查找并调用 startswith 方法
+        public_attr_counts[response_type] = sum(1 for attr in dir(response) if attr[:1] != '_')
+    return public_attr_counts[response_type]
+
+
+def pretty_print_ai_response_prefix(response_type="sync"):
+    sys.stdout.write(STREAM_HEADER if response_type == "stream" else SYNC_HEADER)
+
+
+def format_ai_response_suffix(response, token=None):
+    """
+    技术详情部分的输出文本
+    :param response: 大模型的返回
+    :param token: 响应中没有 token 使用信息时，展示的 token 数据（如流式调用中单独收集的 usage）
+    :return:
+    """
+    # Token 使用情况
+    if hasattr(response, 'usage_metadata') and response.usage_metadata:
+        token_info = response.usage_metadata
+    elif hasattr(response, 'usage') and response.usage:
+        token_info = response.usage
+    else:
+        token_info = token or "未提供"
+    # token 使用情况为字典时通过 orjson 序列化，C 实现比 Python 的 repr 格式化更快
+    if isinstance(token_info, dict):
+        token_info = orjson.dumps(token_info).decode()
+
+    lines = [
+        f"\n{SEPARATOR}",
+        "📊 技术详情:",
+        f"  📁 类型: {type(response).__name__}",
+        f"  💰 Token: {token_info}",
+        # 对象属性统计
+        f"  🔍 属性数: {public_attr_count(response)} 个",
+        SEPARATOR,
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def pretty_print_ai_response_suffix(response, token=None):
+    sys.stdout.write(format_ai_response_suffix(response, token))
+
+
+def pretty_print_ai_response(response):
+    """
+    美化的 AI 响应输出
+    :param response: 大模型的返回
+    :return:
+    """
+    content = response.content if hasattr(response, 'content') else str(response)
+    sys.stdout.write(
+        SYNC_HEADER
+        # 主要内容显示
+        + f"\n💬 回复内容:\n{content}\n"
+        + format_ai_response_suffix(response)
+    )
+
+
+def format_message(msg):
+    """
+    对话历史中单条消息的输出文本，兼容消息对象与字典形式的消息
+    消息对象占绝大多数，直接 getattr 取值，不再先 hasattr 判断再取一次属性
+    :param msg: 消息对象或 {"role": ..., "content": ...} 形式的字典
+    :return:
+    """
+    content = getattr(msg, 'content', MISSING)
+    if content is not MISSING:
+        return f"   {msg.type}: {content}"
+    return f"   {msg.get('role', 'unknown')}: {msg.get('content', '')}"
@@ -0,0 +1,108 @@
+"""
+Agent 示例共用的工具
+各示例直接导入这里定义的工具，@tool 解析类型注解、生成参数 schema 的过程在进程内只执行一次
+工具本身不涉及 I/O，保持同步定义：同步的 invoke 可以直接调用，agent 通过 ainvoke 调用时会自动放到线程池中执行
+"""
+import operator
+from functools import lru_cache
+
+from langchain.tools import tool
+
+
+# 计算器支持的运算符，模块加载时构建一次，每次计算只需一次字典查找，不再逐个比较运算符
+CALCULATOR_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+# 预先绑定查找方法，调用时省去一次属性查找
+get_operator = CALCULATOR_OPERATORS.get
+
+
+@tool
+def calculator(num1: float, operation: str, num2: float) -> float:
+    """
+    执行基本数学运算的计算器工具
+
+    Args:
+        num1: 第一个数字
+        operation: 运算符 (+, -, *, /)
+        num2: 第二个数字
+
+    Returns:
+        float: 计算结果
+    """
+    print(f"🧮 执行计算: {num1} {operation} {num2}")
+
+    op = get_operator(operation)
+    if op is None:
+        raise ValueError(f"不支持的运算符: {operation}")
+    if operation == "/" and num2 == 0:
+        raise ValueError("除数不能为零")
+    return op(num1, num2)
+
+
+# 模拟天气数据，模块加载时构建一次，不再在每次工具调用时重新创建字典
+WEATHER_DATA = {
+    "北京": "晴天，温度 15°C",
+    "上海": "多云，温度 18°C",
+    "广州": "雨天，温度 22°C",
+    "深圳": "阴天，温度 20°C",
+    "杭州": "晴天，温度 16°C"
+}
+
+
+@lru_cache(maxsize=256)
+def lookup_weather(city, get=WEATHER_DATA.get):
+    """
+    查询结果只与城市有关，按城市缓存，未收录城市的提示文案也只格式化一次
+    :param city: 城市名称
+    :param get: 以默认参数预先绑定的 WEATHER_DATA.get，调用时省去属性查找
+    :return:
+    """
+    return get(city) or f"暂无 {city} 的天气信息"
+
+
+@tool
+def weather_checker(city: str) -> str:
+    """
+    查询城市天气信息的工具
+
+    Args:
+        city: 城市名称
+
+    Returns:
+        str: 天气信息
+    """
+    print(f"🌤️ 查询 {city} 的天气")
+    return lookup_weather(city)
+
+
+# 模拟搜索结果，同样只在模块加载时构建一次
+SEARCH_RESULTS = {
+    "人工智能发展": "人工智能是计算机科学的一个分支，致力于创建能够执行通常需要人类智能的任务的机器...",
+    "Python编程": "Python是一种高级编程语言，以其简洁易读的语法和强大的功能库而闻名...",
+    "机器学习": "机器学习是人工智能的一个子领域，使计算机能够在不被明确编程的情况下从数据中学习..."
+}
+
+
+@lru_cache(maxsize=256)
+def lookup_search(query, get=SEARCH_RESULTS.get):
+    """按关键词缓存搜索结果"""
+    return get(query) or f"关于'{query}'的搜索结果显示：这是相关的知识内容..."
+
+
+@tool
+def web_search(query: str) -> str:
+    """
+    模拟网络搜索工具
+
+    Args:
+        query: 搜索关键词
+
+    Returns:
+        str: 搜索结果摘要
+    """
+    print(f"🔍 搜索: {query}")
+    return lookup_search(query)